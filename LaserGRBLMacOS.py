@@ -1,20 +1,657 @@
 import sys
 import re
 import time
+from collections import deque
+from functools import lru_cache, partial
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QComboBox, QMessageBox, QTextEdit, QFileDialog, QLineEdit, QSlider, QFrame,
+    QComboBox, QMessageBox, QTextEdit, QPlainTextEdit, QFileDialog, QLineEdit, QSlider, QFrame,
     QSizePolicy, QGridLayout, QCheckBox, QGraphicsView, QGraphicsScene,
-    QGraphicsLineItem, QGraphicsRectItem, QGraphicsTextItem, QGroupBox, QScrollArea,
+    QGraphicsLineItem, QGraphicsEllipseItem, QGraphicsTextItem, QGroupBox, QScrollArea,
     QProgressBar
 )
 from PyQt6.QtSerialPort import QSerialPort, QSerialPortInfo
-from PyQt6.QtCore import QIODevice, QTimer, Qt, QByteArray, QRectF
+from PyQt6.QtCore import (
+    QIODevice, QTimer, Qt, QByteArray, QDataStream, QRectF, QObject, QRunnable, QThreadPool, QLocale, pyqtSignal
+)
 from PyQt6.QtGui import (
-    QPixmap, QColor, QPen, QTransform, QPainterPath, QDoubleValidator, QPainter, QFont,
-    QTextCharFormat, QTextCursor
+    QPixmap, QColor, QPen, QBrush, QTransform, QPainterPath, QDoubleValidator, QIntValidator, QPainter, QFont,
+    QTextCharFormat, QTextCursor, QTextFormat, QImage
+)
+import numpy as np
+
+GRBL_RX_BUFFER_SIZE = 127 # Usable bytes of GRBL's 128-byte serial receive buffer
+# Stock GRBL firmware is built for 115200 baud; faster rates need a matching firmware build
+BAUD_RATES = (115200, 230400, 250000, 500000, 921600)
+# Status reports are requested on every 'ok'; the timer only polls as a fallback, slowly when idle
+STATUS_POLL_IDLE_MS = 1000
+STATUS_POLL_ACTIVE_MS = 200
+STATUS_REQUEST_MIN_INTERVAL = 0.1 # Seconds between two '?' requests
+# Auto-reconnect waits grow by half after each failed attempt, between these bounds
+RECONNECT_DELAY_MIN_MS = 1000
+RECONNECT_DELAY_MAX_MS = 60000
+
+# Input defaults, also used while a field holds incomplete input
+DEFAULT_JOG_STEP = 1.0
+DEFAULT_RESOLUTION_PPM = 5 # Pixels per Millimeter for image conversion
+DEFAULT_LASER_THRESHOLD = 200 # Pixel intensity threshold for laser ON (0-255)
+
+# Generated programs longer than this are only partly shown in the editor; all lines are still sent
+GCODE_EDITOR_MAX_LINES = 2000
+# Assumed G0 speed in mm/min when estimating job progress, also used for G1 moves without a feed rate.
+# Only its ratio to the programmed feed rates matters, the ETA is scaled by the measured elapsed time.
+RAPID_RATE_ESTIMATE = 3000
+
+# Image scaling choices for conversion: label and ConvertWorker scaling mode
+SCALING_MODES = (
+    ("Smooth (bilinear)", "smooth"),
+    ("Fast (nearest)", "fast"),
+    ("Dithered (black/white)", "dither"),
 )
-from PIL import Image, ImageQt # type: ignore
+
+
+# GRBL real-time status report, e.g. <Idle|WPos:0.000,0.000,0.000|FS:0,0>
+_STATUS_RE = re.compile(r'<(Idle|Run|Hold|Jog|Alarm|Check|Door|Home|Sleep)')
+_WPOS_RE = re.compile(r'WPos:([-\d.]+),([-\d.]+),([-\d.]+)')
+# GRBL welcome banner, e.g. Grbl 1.1h ['$' for help]
+_GRBL_VER_RE = re.compile(r'Grbl ([0-9.]+)')
+
+# G-code text to skip when parsing a program: GRBL system command lines such as $H, (comments)
+# anywhere in a line, unclosed ones to the line end, and ; comments to the line end
+_GCODE_SKIP_RE = re.compile(r'^[^\S\n]*\$.*|\([^)\n]*\)?|;.*', re.MULTILINE)
+# G-code tokens of an (upper-case) program: a word such as "G1", "X12.5" or "S-0.5", or a line end
+_GCODE_TOKEN_RE = re.compile(r'[A-Z][^\S\n]*[-+]?(?:\d+\.?\d*|\.\d+)|\n', re.ASCII)
+# Blanks out word letters and line ends, leaving only the whitespace-separated word values
+_GCODE_VALUES_ONLY = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ\n', ' ' * 27)
+
+
+# Dark application theme, installed once on the QApplication
+_APP_QSS = """
+    QWidget {
+        background-color: #2e2e2e; /* Dark background */
+        color: #e0e0e0; /* Light grey text */
+        font-family: 'Segoe UI', 'Roboto', 'Helvetica Neue', Arial, sans-serif;
+        font-size: 13px; /* Slightly smaller base font */
+    }
+
+    QGroupBox {
+        background-color: #3b3b3b; /* Slightly lighter group background */
+        border: 1px solid #505050;
+        border-radius: 6px; /* Slightly more rounded corners */
+        margin-top: 1.5ex; /* Space for title */
+        font-weight: bold;
+        color: #f0f0f0; /* Group title color */
+        padding: 10px;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        subcontrol-position: top left;
+        padding: 0 5px;
+        color: #a0a0a0; /* Subtler title color */
+        font-size: 14px;
+        font-weight: bold;
+    }
+
+    QLabel {
+        color: #d0d0d0;
+    }
+    QLabel#statusLabel { /* Specific style for status label */
+        font-weight: bold;
+        color: #cccccc; /* Default neutral color */
+    }
+    QLabel#posLabel { /* Specific style for position label */
+        font-family: 'Consolas', 'Courier New', monospace; /* Monospaced for coordinates */
+        font-size: 13px;
+        color: #90ee90; /* Light green for position */
+    }
+
+    QPushButton {
+        background-color: #555555;
+        color: #ffffff;
+        border: 1px solid #777777;
+        border-radius: 4px;
+        padding: 7px 14px; /* Slightly more padding */
+        min-height: 30px; /* Consistent height */
+        font-size: 13px;
+        outline: none; /* Remove focus outline */
+    }
+    QPushButton:hover {
+        background-color: #666666;
+        border-color: #999999;
+    }
+    QPushButton:pressed {
+        background-color: #444444;
+        border-color: #aaaaaa;
+    }
+    QPushButton:disabled {
+        background-color: #383838;
+        color: #777777;
+        border-color: #555555;
+    }
+
+    QComboBox {
+        background-color: #3a3a3a;
+        color: #e0e0e0;
+        border: 1px solid #555;
+        border-radius: 3px;
+        padding: 5px; /* More padding */
+        selection-background-color: #007acc; /* Highlight for selected item */
+        min-height: 30px; /* Consistent height */
+    }
+    QComboBox::drop-down {
+        border: 0px; /* No border for the arrow button */
+        width: 20px; /* Make dropdown arrow area larger */
+        subcontrol-origin: padding;
+        subcontrol-position: center right;
+    }
+    QComboBox::down-arrow {
+        image: url(data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHdpZHRoPSIxNiIgaGVpZ2h0PSIxNiIgdmlld0JveD0iMCAwIDE2IDE2Ij48cGF0aCBmaWxsPSIjRTBFMEUwIiBkPSJNNi42IDExLjZMMyAxMmwxLTIuNmEzIDMgMCAwIDAgMCAuNiAxIDEgMCAwIDAgLjguMiA2IDYgMCAwIDEtNiAxMC42IDYgNiAwIDAgMS02IDZhMSAxIDAgMCAwLS44LS4xIDMgMyAwIDAgMC0uMS0uNyAzIDMgMCAwIDAgLjctLjEgMSAxIDAgMCAwLS41LS43djExLjZ6IiB0cmFuc2Zvcm09InJvdGF0ZSgxODBIDEg4IDgpIiAvPjwvc3ZnPg==); /* Simple white down arrow */
+        width: 12px;
+        height: 12px;
+    }
+    QComboBox QAbstractItemView { /* Styling for dropdown list items */
+        background-color: #3a3a3a;
+        color: #e0e0e0;
+        border: 1px solid #555;
+        selection-background-color: #007acc;
+    }
+
+    QLineEdit {
+        background-color: #3a3a3a;
+        color: #e0e0e0;
+        border: 1px solid #555;
+        border-radius: 3px;
+        padding: 6px; /* More padding */
+        min-height: 30px; /* Consistent height */
+    }
+    QLineEdit:focus {
+        border: 1px solid #0099ff; /* Brighter highlight on focus */
+        background-color: #424242; /* Slightly brighter when focused */
+    }
+
+    QTextEdit, QPlainTextEdit {
+        background-color: #222222; /* Even darker for console/code */
+        color: #f0f0f0; /* Default text color for general input */
+        border: 1px solid #444;
+        border-radius: 3px;
+        padding: 8px; /* More padding */
+        font-family: 'Consolas', 'Fira Code', 'Roboto Mono', monospace; /* Monospaced font for code */
+        font-size: 13px;
+    }
+    QTextEdit::placeholder, QPlainTextEdit::placeholder {
+        color: #888888;
+    }
+    QTextEdit#grblOutputText { /* Specific style for GRBL output */
+        color: #00e6e6; /* Cyan for GRBL responses */
+    }
+
+    QSlider::groove:horizontal {
+        border: 1px solid #555;
+        height: 6px; /* thinner groove */
+        background: #4a4a4a;
+        margin: 2px 0;
+        border-radius: 3px;
+    }
+
+    QSlider::handle:horizontal {
+        background: #0099ff; /* Professional blue accent color */
+        border: 1px solid #006bb3;
+        width: 16px; /* smaller handle */
+        margin: -5px 0; 
+        border-radius: 8px;
+    }
+    QSlider::handle:horizontal:hover {
+        background: #00b3ff;
+    }
+    QSlider::add-page:horizontal {
+        background: #555;
+        border-radius: 3px;
+    }
+    QSlider::sub-page:horizontal {
+        background: #007acc; /* Slightly darker blue for filled part */
+        border-radius: 3px;
+    }
+    QSlider::tick-mark {
+        background: #777;
+        width: 1px;
+        height: 6px; /* vertical tick marks */
+        margin-top: 0px; /* center vertical axis */
+    }
+
+    QGraphicsView {
+        background-color: #1c1c1c; /* Very dark background for the drawing area */
+        border: 1px solid #444;
+        border-radius: 5px;
+    }
+    
+    QScrollArea {
+        border: none; /* No border for the scroll area itself */
+    }
+    QScrollArea > QWidget > QWidget { /* Targeting the inner widget of scroll area */
+        background-color: #2e2e2e; /* Match main background */
+    }
+    
+    /* Scrollbar styling for a cleaner look */
+    QScrollBar:vertical {
+        border: 1px solid #3a3a3a;
+        background: #2a2a2a;
+        width: 12px;
+        margin: 0px 0px 0px 0px;
+        border-radius: 6px;
+    }
+    QScrollBar::handle:vertical {
+        background: #505050;
+        min-height: 20px;
+        border-radius: 5px;
+    }
+    QScrollBar::handle:vertical:hover {
+        background: #606060;
+    }
+    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+        background: none;
+    }
+    QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
+        background: none;
+    }
+
+    QProgressBar {
+        border: 1px solid #505050;
+        border-radius: 5px;
+        text-align: center;
+        color: #e0e0e0;
+        background-color: #4a4a4a;
+    }
+    QProgressBar::chunk {
+        background-color: #007acc;
+        border-radius: 4px;
+    }
+"""
+
+
+# Laser power for each of the 256 gray levels. Darker = higher power: 0-255 (image) maps to
+# 1000-1 (GRBL S), so converting an image is a single table lookup per pixel.
+_POWER_LUT = np.clip((1000 * (1 - np.arange(256) / 255.0)).astype(np.int32), 1, 1000)
+
+
+def _format_mm(value):
+    """Formats a coordinate with up to 3 decimals and no trailing zeros (1.200 -> 1.2)."""
+    return f"{value:.3f}".rstrip('0').rstrip('.')
+
+
+@lru_cache(maxsize=1024)
+def _format_hms(seconds):
+    """Formats a whole number of seconds as HH:MM:SS; ETAs repeat the same values tick after tick."""
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    secs = seconds % 60
+    return f"{hours:02}:{minutes:02}:{secs:02}"
+
+
+def raster_to_gcode(pixels, ppm, threshold, feed_rate):
+    """
+    Converts a grayscale pixel array (0 = black, 255 = white) into raster G-code lines.
+    Rows are scanned zig-zag and consecutive pixels sharing the same laser power are
+    merged into a single move, so the Python-level work scales with runs, not pixels.
+    Returns the lines, the toolpath of their moves in parse_gcode_toolpath's layout and the
+    estimated time at the end of every line, as estimate_gcode_times would give it.
+    """
+    height_px, width_px = pixels.shape
+
+    gcode_commands = [
+        "G21",  # Set units to millimeters
+        "G90",  # Set absolute positioning
+        "G17",  # XY plane
+        f"F{feed_rate}", # Set initial feed rate
+        "M5 S0", # Ensure laser is off and power is zero at start
+    ]
+
+    # Pixels at or above the threshold are too bright and get power 0 (laser OFF)
+    power = _POWER_LUT[pixels]
+    power[pixels >= threshold] = 0
+
+    # The whole move list is found with array operations over the image; Python only loops to
+    # format the moves. Odd rows (1, 3, 5...) run right to left, so they are flipped once here.
+    scan_power = power.copy()
+    scan_power[1::2] = scan_power[1::2, ::-1]
+
+    # Pixel i covers [i, i + 1) / ppm, so a run is burned by a move from its start edge to its end
+    # edge, and every coordinate stays within the image. Only the part of each row that has
+    # something to burn is travelled: from the start edge of its first dark pixel to the end edge
+    # of its last one.
+    dark = scan_power > 0
+    burn_rows = np.flatnonzero(dark.any(axis=1)) # Blank rows are skipped entirely
+    first_dark = dark[burn_rows].argmax(axis=1)
+    last_dark = width_px - 1 - dark[burn_rows, ::-1].argmax(axis=1)
+
+    # Last pixel of every run of equal power within the travelled part of each row
+    positions = np.arange(width_px)
+    is_run_end = np.ones((burn_rows.size, width_px), dtype=bool)
+    is_run_end[:, :-1] = scan_power[burn_rows, 1:] != scan_power[burn_rows, :-1]
+    is_run_end &= (positions >= first_dark[:, None]) & (positions <= last_dark[:, None])
+    end_rows, end_positions = np.nonzero(is_run_end) # end_rows indexes burn_rows
+
+    # Every row is a laser-off move to its start edge followed by one move per run, to the run's
+    # end edge. Edges are numbered 0 to width_px in scan order, mirrored back for odd rows.
+    row_offsets = np.searchsorted(end_rows, np.arange(burn_rows.size))
+    move_rows = np.insert(burn_rows[end_rows], row_offsets, burn_rows)
+    move_edges = np.insert(end_positions + 1, row_offsets, first_dark)
+    move_power = np.insert(scan_power[burn_rows[end_rows], end_positions], row_offsets, 0)
+    move_columns = np.where(move_rows % 2 == 1, width_px - move_edges, move_edges)
+
+    # At most one line per move, the return to origin and the footer; the list is allocated
+    # once and trimmed at the end, as moves to where the head already is emit nothing
+    header_count = line_count = len(gcode_commands)
+    gcode_commands.extend([None] * (move_rows.size + 2))
+
+    # The X/Y grid is fixed by ppm, so each coordinate is formatted once instead of once per move.
+    # X runs over the pixel edges, 0 to width_px.
+    x_strs = [_format_mm(x_px / ppm) for x_px in range(width_px + 1)]
+    y_strs = [_format_mm(y_px / ppm) for y_px in range(height_px)] # No inversion, image y_px grows downwards
+
+    # GRBL is modal, so only the words that change are emitted (motion mode, laser
+    # state, X, Y and S). This keeps every line as short as possible on the serial link.
+    laser_on = False
+    motion = None
+    last_x = last_y = None
+    last_power = 0
+
+    def move_to(x, y, laser_power):
+        nonlocal laser_on, motion, last_x, last_y, last_power, line_count
+        if x == last_x and y == last_y:
+            return # Skip moves to where the head already is
+        words = []
+        if laser_power:
+            if not laser_on:
+                words.append('M3')
+                laser_on = True
+            if motion != 'G1':
+                words.append('G1')
+                motion = 'G1'
+        else: # Laser OFF, move without burning
+            if laser_on:
+                words.append('M5')
+                laser_on = False
+            if motion != 'G0':
+                words.append('G0')
+                motion = 'G0'
+        if x != last_x:
+            words.append('X' + x)
+            last_x = x
+        if y != last_y:
+            words.append('Y' + y)
+            last_y = y
+        if laser_power and laser_power != last_power:
+            words.append(f'S{laser_power}')
+            last_power = laser_power
+        gcode_commands[line_count] = ''.join(words)
+        line_count += 1
+
+    for x_px, y_px, laser_power in zip(move_columns.tolist(), move_rows.tolist(), move_power.tolist()):
+        move_to(x_strs[x_px], y_strs[y_px], laser_power)
+
+    move_to('0', '0', 0) # Return to origin with the laser off
+    gcode_commands[line_count] = "M5 S0" # Ensure laser is off
+    del gcode_commands[line_count + 1:]
+
+    # Toolpath: end edge, row and laser power of every move, then the return to origin
+    toolpath = (np.append(move_columns, 0).astype(np.float32) / ppm,
+                np.append(move_rows, 0).astype(np.float32) / ppm,
+                np.append(move_power, 0).astype(np.float32))
+
+    # Estimated times straight from the moves, without parsing the lines back: G1 runs at the feed
+    # rate and G0 at RAPID_RATE_ESTIMATE, over the coordinates as written (3 decimals). A move
+    # emits a line unless it stays on the same pixel.
+    move_x = np.round(np.append(move_columns, 0) / ppm, 3)
+    move_y = np.round(np.append(move_rows, 0) / ppm, 3)
+    move_length = np.hypot(np.diff(move_x, prepend=0.0), np.diff(move_y, prepend=0.0))
+    burn_rate = feed_rate if feed_rate > 0 else RAPID_RATE_ESTIMATE
+    move_times = np.cumsum(move_length / np.where(toolpath[2] > 0, burn_rate, RAPID_RATE_ESTIMATE)) * 60
+    emitted = np.ones(move_x.size, dtype=bool)
+    emitted[1:] = (np.diff(move_x) != 0) | (np.diff(move_y) != 0)
+    line_times = np.concatenate((np.zeros(header_count), move_times[emitted], move_times[-1:]))
+    return gcode_commands, toolpath, line_times
+
+
+def _forward_fill(mask, values, initial):
+    """For each position, the value at the last position where mask is set (initial before any)."""
+    last = np.maximum.accumulate(np.where(mask, np.arange(mask.size), -1))
+    return np.where(last >= 0, values[last], initial)
+
+
+def _gcode_line_states(gcode):
+    """
+    Resolves the modal state of G-code (a string or a list of lines) at the end of every line, as
+    (is_move, x, y, motion_mode, laser_enabled, laser_power, feed_rate) arrays with one entry per line.
+    A line is a move if it sets X or Y while a motion mode (G0, G1, G2, G3 or G38.x) is active, unless
+    its axis words belong to G10, G28, G30 or G92; motion_mode is -1 before any and after G80.
+    """
+    if not isinstance(gcode, str):
+        gcode = '\n'.join(gcode)
+
+    # One regex pass collects the words and line ends of the program, joined back into a compact
+    # string such as "G1X12.5S300\nX13Y2\n"; letters and values are then split out with array
+    # operations (every letter is followed by exactly one well-formed value)
+    tokens = ''.join(_GCODE_TOKEN_RE.findall(_GCODE_SKIP_RE.sub('', gcode.upper()) + '\n'))
+    chars = np.frombuffer(tokens.encode('ascii'), dtype=np.uint8)
+    letters = chars[(chars >= ord('A')) | (chars == ord('\n'))]
+    is_word = letters != ord('\n')
+    numbers = np.zeros(letters.size)
+    numbers[is_word] = np.array(tokens.translate(_GCODE_VALUES_ONLY).split(), dtype=np.float64)
+
+    # G-code is modal: the motion mode, laser state, power, feed rate and coordinates in effect at
+    # the end of each line are those of the last word setting them, at or before that line end
+    is_end = ~is_word
+    line_of_token = np.cumsum(is_end) - is_end # Line ends belong to the line they close
+    is_g = letters == ord('G')
+    is_motion = is_g & (np.isin(numbers, (0, 1, 2, 3, 80)) | ((numbers >= 38) & (numbers < 39)))
+    is_laser = (letters == ord('M')) & ((numbers == 3) | (numbers == 4) | (numbers == 5))
+    motion_mode = _forward_fill(is_motion, np.where(numbers == 80, -1.0, numbers), -1.0)
+    laser_enabled = _forward_fill(is_laser, numbers != 5, False)
+    laser_power = _forward_fill(letters == ord('S'), numbers, 0.0)
+    feed_rate = _forward_fill(letters == ord('F'), numbers, 0.0)
+
+    # Axis words of G10, G28, G30 and G92 set offsets or intermediate points instead of moving; those
+    # of G92 still give the current position in the new coordinate system. Other axis words only
+    # move the tool while a motion mode is active
+    ends = np.flatnonzero(is_end)
+    non_motion_line = np.zeros(ends.size, dtype=bool)
+    non_motion_line[line_of_token[is_g & np.isin(numbers, (10, 28, 30, 92))]] = True
+    sets_position = np.zeros(ends.size, dtype=bool)
+    sets_position[line_of_token[is_g & (numbers == 92)]] = True
+    is_move_line = ~non_motion_line & (motion_mode[ends] >= 0)
+    sets_position |= is_move_line
+    is_x = (letters == ord('X')) & sets_position[line_of_token]
+    is_y = (letters == ord('Y')) & sets_position[line_of_token]
+    current_x = _forward_fill(is_x, numbers, 0.0)
+    current_y = _forward_fill(is_y, numbers, 0.0)
+
+    sets_xy = np.zeros(ends.size, dtype=bool)
+    sets_xy[line_of_token[is_x | is_y]] = True
+    is_move = sets_xy & is_move_line
+    return (is_move, current_x[ends], current_y[ends], motion_mode[ends], laser_enabled[ends],
+            laser_power[ends], feed_rate[ends])
+
+
+def parse_gcode_toolpath(gcode):
+    """
+    Parses G-code (a string or a list of lines) into a toolpath of move end points, stored
+    column-wise as (x, y, s) float32 arrays. s is the laser power of the move, 0 for travel and
+    -1 where the position changes without a straight G0/G1 line (arcs, probing, G92), not drawn.
+    """
+    is_move, x, y, motion_mode, laser_enabled, laser_power, _ = _gcode_line_states(gcode)
+
+    # Laser burns only on G1 moves with the laser enabled and a non-zero power
+    burning = (motion_mode == 1) & laser_enabled
+    move_s = np.where(burning, laser_power, 0.0)
+    moves_position = (np.diff(x, prepend=0.0) != 0) | (np.diff(y, prepend=0.0) != 0)
+    move_s[moves_position & ~(is_move & (motion_mode <= 1))] = -1.0
+    keep = is_move | moves_position
+    return x[keep].astype(np.float32), y[keep].astype(np.float32), move_s[keep].astype(np.float32)
+
+
+def estimate_gcode_times(gcode_lines):
+    """
+    Estimates, for each line of a G-code program, the time in seconds from the start of the job
+    until that line has been executed, from its move lengths and feed rates.
+    """
+    is_move, x, y, motion_mode, _, _, feed_rate = _gcode_line_states(gcode_lines)
+    move_length = np.where(is_move, np.hypot(np.diff(x, prepend=0.0), np.diff(y, prepend=0.0)), 0.0)
+    # Every mode but G0 runs at the feed rate; an arc counts as its chord
+    move_rate = np.where((motion_mode > 0) & (feed_rate > 0), feed_rate, RAPID_RATE_ESTIMATE)
+    return np.cumsum(move_length / move_rate) * 60 # Rates are in mm/min
+
+
+def _segments_to_path(start_x, start_y, end_x, end_y):
+    """
+    Builds a QPainterPath from line segments, starting a new sub-path only where a segment doesn't
+    continue the previous one. The elements are computed with NumPy and read in with a single
+    QDataStream call, in Qt's serialization format, instead of one moveTo/lineTo call per point.
+    """
+    if end_x.size == 0:
+        return QPainterPath()
+
+    # Elements of the equivalent moveTo/lineTo sequence: a moveTo before each disconnected segment
+    needs_move = np.ones(end_x.size, dtype=bool)
+    needs_move[1:] = (start_x[1:] != end_x[:-1]) | (start_y[1:] != end_y[:-1])
+    line_index = np.arange(end_x.size) + np.cumsum(needs_move)
+    move_index = line_index[needs_move] - 1
+    is_move = np.zeros(line_index[-1] + 1, dtype=bool)
+    is_move[move_index] = True
+    element_x = np.empty(is_move.size)
+    element_y = np.empty(is_move.size)
+    element_x[line_index], element_y[line_index] = end_x, end_y
+    element_x[move_index], element_y[move_index] = start_x[needs_move], start_y[needs_move]
+
+    # Same clean-up as QPainterPath itself: a lineTo to the current point is dropped, and a moveTo
+    # directly followed by another one is replaced by it
+    same_point = np.zeros(is_move.size, dtype=bool)
+    same_point[1:] = (element_x[1:] == element_x[:-1]) & (element_y[1:] == element_y[:-1])
+    keep = is_move | ~same_point
+    is_move, element_x, element_y = is_move[keep], element_x[keep], element_y[keep]
+    keep = np.ones(is_move.size, dtype=bool)
+    keep[:-1] = ~(is_move[:-1] & is_move[1:])
+    is_move, element_x, element_y = is_move[keep], element_x[keep], element_y[keep]
+
+    # Serialized path: element count, (type, x, y) per element, start of the last sub-path, fill rule
+    elements = np.empty(is_move.size, dtype=[('type', '>i4'), ('x', '>f8'), ('y', '>f8')])
+    elements['type'] = np.where(is_move, 0, 1) # QPainterPath.ElementType MoveToElement, LineToElement
+    elements['x'] = element_x
+    elements['y'] = element_y
+    header = np.array([is_move.size], dtype='>i4').tobytes()
+    footer = np.array([np.flatnonzero(is_move)[-1], 0], dtype='>i4').tobytes() # 0 is OddEvenFill
+    path = QPainterPath()
+    QDataStream(QByteArray(header + elements.tobytes() + footer)) >> path
+    return path
+
+
+def build_preview_paths(toolpath):
+    """
+    Builds the preview of a toolpath as two painter paths, (burn, travel), so the scene
+    holds two items instead of one QGraphicsLineItem per G-code move.
+    """
+    move_x, move_y, move_s = toolpath
+    end_x = move_x.astype(np.float64)
+    end_y = move_y.astype(np.float64)
+    start_x = np.append(0.0, end_x[:-1]) # Every move starts where the previous one ended
+    start_y = np.append(0.0, end_y[:-1])
+    burning = move_s > 0
+    travel = move_s == 0 # Arcs and probing moves (s < 0) only carry the position forward
+    return (_segments_to_path(start_x[burning], start_y[burning], end_x[burning], end_y[burning]),
+            _segments_to_path(start_x[travel], start_y[travel], end_x[travel], end_y[travel]))
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by ConvertWorker back to the GUI thread."""
+    finished = pyqtSignal(list, tuple, object) # Generated G-code lines, toolpath, estimated line times
+    error = pyqtSignal(str, str) # Dialog title, message
+
+
+class ConvertWorker(QRunnable):
+    """Loads an image and converts it to raster G-code on a QThreadPool thread."""
+    def __init__(self, image_path, width_px, height_px, ppm, threshold, feed_rate, scaling="smooth"):
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.image_path = image_path
+        self.width_px = width_px
+        self.height_px = height_px
+        self.ppm = ppm
+        self.threshold = threshold
+        self.feed_rate = feed_rate
+        self.scaling = scaling # "smooth", "fast" or "dither", see SCALING_MODES
+
+    def run(self):
+        img = QImage(self.image_path) # Decoded by Qt's own image plugins
+        if img.isNull():
+            self.signals.error.emit("Image Loading Error", f"Failed to load image: {self.image_path}")
+            return
+
+        try:
+            # Resize without maintaining aspect ratio to fit the specified dimensions, then convert to grayscale
+            if self.scaling == "fast":
+                transformation = Qt.TransformationMode.FastTransformation # Nearest neighbour
+            else:
+                transformation = Qt.TransformationMode.SmoothTransformation # Bilinear
+            img = img.scaled(self.width_px, self.height_px, Qt.AspectRatioMode.IgnoreAspectRatio, transformation)
+            if img.isNull(): # A size under one pixel, e.g. 0.1 mm at 1 PPM, scales to no image at all
+                self.signals.error.emit("Image Size Too Small",
+                                        f"The image would be {self.width_px} x {self.height_px} pixels. "
+                                        "Please increase the width, height or resolution.")
+                return
+            if self.scaling == "dither":
+                # Error-diffused black/white pixels render gray levels at full power, not through the threshold
+                img = img.convertToFormat(QImage.Format.Format_Mono, Qt.ImageConversionFlag.DiffuseDither)
+            img = img.convertToFormat(QImage.Format.Format_Grayscale8)
+
+            # Zero-copy view of the pixel data; rows are padded to bytesPerLine()
+            bits = img.constBits()
+            bits.setsize(img.sizeInBytes())
+            pixels = np.frombuffer(bits, dtype=np.uint8).reshape(img.height(), img.bytesPerLine())[:, :img.width()]
+
+            gcode_commands, toolpath, line_times = raster_to_gcode(pixels, self.ppm, self.threshold, self.feed_rate)
+        except Exception as e:
+            self.signals.error.emit("Conversion Error", f"Failed to convert image: {e}")
+            return
+        self.signals.finished.emit(gcode_commands, toolpath, line_times)
+
+
+class PreviewSignals(QObject):
+    """Signals emitted by PreviewWorker back to the GUI thread."""
+    finished = pyqtSignal(int, object, object) # Preview generation, burn path, travel path
+
+
+class PreviewWorker(QRunnable):
+    """Parses G-code and builds its preview paths on a QThreadPool thread."""
+    def __init__(self, generation, gcode, toolpath=None):
+        super().__init__()
+        self.signals = PreviewSignals()
+        self.generation = generation # Lets the GUI drop the result if a newer preview was started
+        self.gcode = gcode
+        self.toolpath = toolpath
+
+    def run(self):
+        toolpath = self.toolpath
+        if toolpath is None:
+            toolpath = parse_gcode_toolpath(self.gcode)
+        burn_path, travel_path = build_preview_paths(toolpath)
+        self.signals.finished.emit(self.generation, burn_path, travel_path)
+
+
+class EstimateSignals(QObject):
+    """Signals emitted by EstimateWorker back to the GUI thread."""
+    finished = pyqtSignal(int, object) # Job generation, estimated line times
+
+
+class EstimateWorker(QRunnable):
+    """Estimates the line times of hand-edited G-code on a QThreadPool thread."""
+    def __init__(self, generation, gcode_lines):
+        super().__init__()
+        self.signals = EstimateSignals()
+        self.generation = generation # Lets the GUI drop the result if the job has been replaced
+        self.gcode_lines = gcode_lines
+
+    def run(self):
+        self.signals.finished.emit(self.generation, estimate_gcode_times(self.gcode_lines))
+
 
 class LaserControllerApp(QWidget):
     def __init__(self):
@@ -26,32 +663,101 @@ class LaserControllerApp(QWidget):
         self.current_y = 0.0
         self.current_z = 0.0
         self.grbl_status = "Disconnected"
+        self._last_status_report = None # Raw text of the last status report parsed
         
-        self.jog_step = 1.0 
-        self.preview_image_resolution_ppm = 5 # Pixels per Millimeter for image conversion
-        self.laser_threshold = 200 # Pixel intensity threshold for laser ON (0-255)
-        
+        # Deadline for the GRBL banner; detection itself completes as soon as the banner arrives
         self.grbl_detect_timer = QTimer(self)
         self.grbl_detect_timer.setSingleShot(True)
         self.grbl_detect_timer.timeout.connect(self._check_grbl_response)
-        self.grbl_response_buffer = ""
+        self.grbl_response_buffer = bytearray() # Raw bytes received while waiting for the banner
+
+        # Retries a failed connection when auto-reconnect is on, with exponential back-off
+        self._reconnect_delay_ms = RECONNECT_DELAY_MIN_MS
+        self._reconnect_timer = QTimer(self)
+        self._reconnect_timer.setSingleShot(True)
+        self._reconnect_timer.timeout.connect(self.connect_serial)
 
         self.status_timer = QTimer(self)
         self.status_timer.timeout.connect(self.request_grbl_status)
+        self._last_status_request = 0.0 # time.monotonic() of the last '?' sent
+
+        # GRBL replies only record what changed; one coalescing timer then updates the widgets at
+        # most every 50 ms, however fast the status reports and 'ok's arrive
+        self._pending_status_text = None # Status/position label texts from the latest reports
+        self._pending_pos_text = None # Also marks the preview position indicator as out of date
+        self._progress_dirty = False # Progress bar and estimated time need an update
+        self._highlight_dirty = False # Current-line highlight needs to move
+        self._ui_refresh = QTimer(self)
+        self._ui_refresh.setInterval(50)
+        self._ui_refresh.setSingleShot(True)
+        self._ui_refresh.timeout.connect(self._refresh_ui)
         
-        # List to hold G-code commands for sequential sending
-        self.gcode_to_send_queue = []
+        # G-code still to be sent: any iterable of lines, consumed lazily with one line of lookahead
+        self._gcode_iter = iter(())
+        self._gcode_next_line = None
         self.total_gcode_lines = 0
         self.gcode_lines_sent = 0
         self.gcode_current_line_index = -1 # Index for highlighting
         self.gcode_start_time = 0 # To track execution time
+        self._gcode_line_times = None # Estimated time at which each streamed line is done, if any
+        self._gcode_lines = None # Lines of the last generated G-code, until the text is edited
+        self._gcode_toolpath = None # Their (x, y, s) toolpath arrays, see parse_gcode_toolpath
+        self._gcode_estimate = None # Their estimated line times, see estimate_gcode_times
+        self._gcode_job_generation = 0 # Incremented by every job; only its own time estimate is used
+        self._convert_worker = None # Image conversion running on the thread pool, if any
+        self._preview_generation = 0 # Incremented by every preview; only the latest one is drawn
+        self._deferred_preview = None # (G-code, toolpath) of a preview requested while the view was hidden
+
+        # Preview pens, created once instead of on every redraw
+        self._grid_pen = QPen(QColor(60, 60, 60), 0.5) # Darker gray for grid
+        self._origin_pen = QPen(QColor(255, 0, 0), 1.5) # Red for origin
+        self._bounds_pen = QPen(QColor(100, 100, 255), 2) # Blue for bounds
+        self._travel_pen = QPen(QColor(200, 200, 200), 0.5) # Grey for rapid/off moves
+        self._burn_pen = QPen(QColor(0, 200, 0), 0.5) # Green for laser on
+        self._pos_brush = QBrush(QColor(255, 255, 0)) # Yellow current position dot
+        self._no_pen = QPen(Qt.PenStyle.NoPen)
+        # Current position dot: a single unit circle, scaled to the scene and moved with setPos
+        self._pos_indicator = QGraphicsEllipseItem(-0.5, -0.5, 1.0, 1.0)
+        self._pos_indicator.setBrush(self._pos_brush)
+        self._pos_indicator.setPen(self._no_pen)
+        self._pos_indicator.setZValue(1) # Above the toolpath
+
+        # Current-line highlight is an extra selection, so the document itself is never reformatted
+        highlight_format = QTextCharFormat()
+        highlight_format.setBackground(QColor(50, 150, 255, 100)) # Light blue with transparency
+        highlight_format.setProperty(QTextFormat.Property.FullWidthSelection, True)
+        self._highlight_sel = QTextEdit.ExtraSelection()
+        self._highlight_sel.format = highlight_format
+        self._highlight_line_index = -1
         
-        self.gcode_send_timer = QTimer(self)
-        self.gcode_send_timer.setSingleShot(True) # Send one command at a time
-        self.gcode_send_timer.timeout.connect(self._send_next_gcode_command)
+        self._rx_carry = bytearray() # Received bytes after the last complete line
+        # GRBL replies are classified by their first character: '<' status report, 'ok', 'error'
+        self._line_handlers = {'<': self._handle_status, 'o': self._handle_ok, 'e': self._handle_error}
+
+        # Console lines are buffered and appended together at ~30 Hz instead of one reflow per line
+        self._log_buffer = []
+        self._log_flush_timer = QTimer(self)
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(33)
+        self._log_flush_timer.timeout.connect(self._flush_log)
+        # Console colours are applied as character formats on plain text, never parsed from HTML
+        self._log_formats = {}
+        for kind, color in (("plain", None), ("info", "#88dd88"), ("status", "#00ffff"),
+                            ("ok", "#00ff00"), ("error", "#ff0000"), ("sent", "#ffff00")):
+            log_format = QTextCharFormat()
+            if color:
+                log_format.setForeground(QColor(color))
+            self._log_formats[kind] = log_format
+
+        # Character-counting stream state: sizes of lines sent but not yet acknowledged, manual
+        # commands included, as GRBL answers each buffered line with one 'ok' or 'error' in order.
+        # The last _pending_streamed of them are lines of the running G-code job.
+        self._pending_lens = deque()
+        self._pending_bytes = 0
+        self._pending_streamed = 0
+        self._sending_gcode = False # Guards _send_next_gcode_command against reentry
 
         self.initUI()
-        self.apply_styles() # Apply custom styles
         self.populate_serial_ports()
 
     def initUI(self):
@@ -90,9 +796,23 @@ class LaserControllerApp(QWidget):
         port_selection_layout.addWidget(self.refresh_ports_button)
         port_connection_layout.addLayout(port_selection_layout)
 
+        baud_rate_layout = QHBoxLayout()
+        baud_rate_layout.addWidget(QLabel('Baud Rate:'))
+        self.baud_rate_combo = QComboBox(self)
+        for baud_rate in BAUD_RATES:
+            self.baud_rate_combo.addItem(str(baud_rate), baud_rate)
+        self.baud_rate_combo.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
+        baud_rate_layout.addWidget(self.baud_rate_combo)
+        port_connection_layout.addLayout(baud_rate_layout)
+
         self.connect_button = QPushButton('Connect', self)
         self.connect_button.clicked.connect(self.toggle_connection)
         port_connection_layout.addWidget(self.connect_button)
+
+        self.auto_reconnect_checkbox = QCheckBox('Auto-reconnect', self)
+        self.auto_reconnect_checkbox.setToolTip("Keep retrying, with growing delays, when connecting or GRBL detection fails.")
+        self.auto_reconnect_checkbox.toggled.connect(self._on_auto_reconnect_toggled)
+        port_connection_layout.addWidget(self.auto_reconnect_checkbox)
         
         self.status_label = QLabel('Status: Disconnected', self)
         self.status_label.setObjectName("statusLabel")
@@ -111,9 +831,8 @@ class LaserControllerApp(QWidget):
 
         jog_step_layout = QHBoxLayout()
         jog_step_layout.addWidget(QLabel('Step (mm):'))
-        self.jog_step_input = QLineEdit(str(self.jog_step), self)
+        self.jog_step_input = QLineEdit(QLocale().toString(DEFAULT_JOG_STEP), self) # Written in the validator's locale
         self.jog_step_input.setValidator(QDoubleValidator(0.01, 999.0, 3))
-        self.jog_step_input.editingFinished.connect(self.update_jog_step)
         jog_step_layout.addWidget(self.jog_step_input)
         jog_layout.addLayout(jog_step_layout)
 
@@ -121,31 +840,31 @@ class LaserControllerApp(QWidget):
         jog_buttons_grid.setSpacing(5)
 
         self.jog_btn_z_plus = QPushButton('Z+', self)
-        self.jog_btn_z_plus.clicked.connect(lambda: self.send_jog_command_z(self.jog_step))
+        self.jog_btn_z_plus.clicked.connect(partial(self._jog_z, 1))
         jog_buttons_grid.addWidget(self.jog_btn_z_plus, 0, 3)
 
         self.jog_btn_y_plus = QPushButton('Y+', self)
-        self.jog_btn_y_plus.clicked.connect(lambda: self.send_jog_command(0, self.jog_step))
+        self.jog_btn_y_plus.clicked.connect(partial(self._jog_xy, 0, 1))
         jog_buttons_grid.addWidget(self.jog_btn_y_plus, 1, 1)
 
         self.jog_btn_x_minus = QPushButton('X-', self)
-        self.jog_btn_x_minus.clicked.connect(lambda: self.send_jog_command(-self.jog_step, 0))
+        self.jog_btn_x_minus.clicked.connect(partial(self._jog_xy, -1, 0))
         jog_buttons_grid.addWidget(self.jog_btn_x_minus, 2, 0)
         
         self.jog_btn_home = QPushButton('Home ($H)', self)
-        self.jog_btn_home.clicked.connect(lambda: self.send_command('$H'))
+        self.jog_btn_home.clicked.connect(partial(self.send_command, '$H'))
         jog_buttons_grid.addWidget(self.jog_btn_home, 2, 1)
         
         self.jog_btn_x_plus = QPushButton('X+', self)
-        self.jog_btn_x_plus.clicked.connect(lambda: self.send_jog_command(self.jog_step, 0))
+        self.jog_btn_x_plus.clicked.connect(partial(self._jog_xy, 1, 0))
         jog_buttons_grid.addWidget(self.jog_btn_x_plus, 2, 2)
 
         self.jog_btn_y_minus = QPushButton('Y-', self)
-        self.jog_btn_y_minus.clicked.connect(lambda: self.send_jog_command(0, -self.jog_step))
+        self.jog_btn_y_minus.clicked.connect(partial(self._jog_xy, 0, -1))
         jog_buttons_grid.addWidget(self.jog_btn_y_minus, 3, 1)
         
         self.jog_btn_z_minus = QPushButton('Z-', self)
-        self.jog_btn_z_minus.clicked.connect(lambda: self.send_jog_command_z(-self.jog_step))
+        self.jog_btn_z_minus.clicked.connect(partial(self._jog_z, -1))
         jog_buttons_grid.addWidget(self.jog_btn_z_minus, 4, 3)
 
         jog_layout.addLayout(jog_buttons_grid)
@@ -158,55 +877,22 @@ class LaserControllerApp(QWidget):
         control_buttons_layout.addWidget(self.jog_btn_set_origin)
 
         self.jog_btn_unlock = QPushButton('Unlock ($X)', self)
-        self.jog_btn_unlock.clicked.connect(lambda: self.send_command('$X'))
+        self.jog_btn_unlock.clicked.connect(partial(self.send_command, '$X'))
         control_buttons_layout.addWidget(self.jog_btn_unlock)
         
         self.jog_btn_soft_reset = QPushButton('Soft Reset', self)
-        self.jog_btn_soft_reset.clicked.connect(lambda: self.send_command('\x18'))
+        self.jog_btn_soft_reset.clicked.connect(partial(self.send_command, '\x18'))
         control_buttons_layout.addWidget(self.jog_btn_soft_reset)
         jog_layout.addLayout(control_buttons_layout)
         
         left_panel_layout.addWidget(jog_group)
         
-        # --- Quick Commands/Macros Group ---
-        quick_commands_group = QGroupBox('Quick Commands (Macros)', self)
-        quick_commands_layout = QGridLayout(quick_commands_group)
-        quick_commands_layout.setSpacing(8)
-        quick_commands_layout.setContentsMargins(10, 20, 10, 10)
-
-        self.btn_home_macro = QPushButton('Home ($H)', self)
-        self.btn_home_macro.clicked.connect(lambda: self.send_command('$H'))
-        quick_commands_layout.addWidget(self.btn_home_macro, 0, 0)
-
-        self.btn_goto_zero = QPushButton('Go to Zero (G0 X0Y0Z0)', self)
-        self.btn_goto_zero.clicked.connect(lambda: self.send_command('G0 X0 Y0 Z0'))
-        quick_commands_layout.addWidget(self.btn_goto_zero, 0, 1)
-
-        self.btn_soft_reset_macro = QPushButton('Soft Reset (Ctrl-X)', self)
-        self.btn_soft_reset_macro.clicked.connect(lambda: self.send_command('\x18'))
-        quick_commands_layout.addWidget(self.btn_soft_reset_macro, 1, 0)
-        
-        self.btn_unlock_macro = QPushButton('Unlock ($X)', self)
-        self.btn_unlock_macro.clicked.connect(lambda: self.send_command('$X'))
-        quick_commands_layout.addWidget(self.btn_unlock_macro, 1, 1)
-
-        self.btn_grbl_settings = QPushButton('GRBL Settings ($$)', self)
-        self.btn_grbl_settings.clicked.connect(lambda: self.send_command('$$'))
-        quick_commands_layout.addWidget(self.btn_grbl_settings, 2, 0)
-
-        self.btn_grbl_parser_state = QPushButton('Parser State ($G)', self)
-        self.btn_grbl_parser_state.clicked.connect(lambda: self.send_command('$G'))
-        quick_commands_layout.addWidget(self.btn_grbl_parser_state, 2, 1)
-
-        self.btn_laser_test_on = QPushButton('Laser Test ON (S10)', self)
-        self.btn_laser_test_on.clicked.connect(lambda: self.send_command('M3 S10'))
-        quick_commands_layout.addWidget(self.btn_laser_test_on, 3, 0)
-
-        self.btn_laser_test_off = QPushButton('Laser Test OFF (M5)', self)
-        self.btn_laser_test_off.clicked.connect(lambda: self.send_command('M5 S0'))
-        quick_commands_layout.addWidget(self.btn_laser_test_off, 3, 1)
-
-        left_panel_layout.addWidget(quick_commands_group)
+        # --- Quick Commands/Macros Group (built on first connection) ---
+        self.quick_commands_group = None
+        self._quick_commands_placeholder = QWidget(self)
+        placeholder_layout = QVBoxLayout(self._quick_commands_placeholder)
+        placeholder_layout.setContentsMargins(0, 0, 0, 0)
+        left_panel_layout.addWidget(self._quick_commands_placeholder)
 
 
         # --- Laser/Feed Rate Sliders Group ---
@@ -275,16 +961,20 @@ class LaserControllerApp(QWidget):
         settings_layout.addWidget(self.height_input, 1, 1)
 
         settings_layout.addWidget(QLabel('Laser Threshold (0-255):'), 0, 2)
-        self.laser_threshold_input = QLineEdit(str(self.laser_threshold), self)
-        self.laser_threshold_input.setValidator(QDoubleValidator(0.0, 255.0, 0))
-        self.laser_threshold_input.editingFinished.connect(self.update_laser_threshold)
+        self.laser_threshold_input = QLineEdit(str(DEFAULT_LASER_THRESHOLD), self)
+        self.laser_threshold_input.setValidator(QIntValidator(0, 255))
         settings_layout.addWidget(self.laser_threshold_input, 0, 3)
         
         settings_layout.addWidget(QLabel('Resolution (PPM):'), 1, 2)
-        self.preview_resolution_input = QLineEdit(str(self.preview_image_resolution_ppm), self)
-        self.preview_resolution_input.setValidator(QDoubleValidator(1.0, 50.0, 0))
-        self.preview_resolution_input.editingFinished.connect(self.update_preview_resolution)
+        self.preview_resolution_input = QLineEdit(str(DEFAULT_RESOLUTION_PPM), self)
+        self.preview_resolution_input.setValidator(QIntValidator(1, 50))
         settings_layout.addWidget(self.preview_resolution_input, 1, 3)
+
+        settings_layout.addWidget(QLabel('Scaling:'), 2, 0)
+        self.scaling_combo = QComboBox(self)
+        for label, mode in SCALING_MODES:
+            self.scaling_combo.addItem(label, mode)
+        settings_layout.addWidget(self.scaling_combo, 2, 1, 1, 3)
         
         image_convert_layout.addLayout(settings_layout)
 
@@ -301,9 +991,11 @@ class LaserControllerApp(QWidget):
         gcode_console_layout.setContentsMargins(10, 20, 10, 10)
         
         gcode_console_layout.addWidget(QLabel('G-code to Send:'))
-        self.gcode_input = QTextEdit(self)
+        self.gcode_input = QPlainTextEdit(self) # Plain text lays out large programs far faster than QTextEdit
         self.gcode_input.setPlaceholderText("Type or paste G-code commands here / G-code from image will appear here.")
         self.gcode_input.setMinimumHeight(100)
+        self.gcode_input.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.gcode_input.textChanged.connect(self._on_gcode_text_edited)
         gcode_console_layout.addWidget(self.gcode_input)
         
         # Progress and Estimated Time
@@ -319,6 +1011,15 @@ class LaserControllerApp(QWidget):
         
         gcode_console_layout.addLayout(progress_layout)
 
+        gcode_buttons_layout = QHBoxLayout()
+        self.preview_gcode_button = QPushButton('Preview G-code', self)
+        self.preview_gcode_button.clicked.connect(self.preview_gcode_input)
+        gcode_buttons_layout.addWidget(self.preview_gcode_button)
+        self.clear_gcode_button = QPushButton('Clear G-code', self)
+        self.clear_gcode_button.clicked.connect(self.clear_gcode)
+        gcode_buttons_layout.addWidget(self.clear_gcode_button)
+        gcode_console_layout.addLayout(gcode_buttons_layout)
+
         self.send_gcode_button = QPushButton('Send G-code', self)
         self.send_gcode_button.clicked.connect(self.send_gcode)
         self.send_gcode_button.setEnabled(False)
@@ -326,9 +1027,11 @@ class LaserControllerApp(QWidget):
         
         self.grbl_output_text = QTextEdit(self)
         self.grbl_output_text.setReadOnly(True)
+        self.grbl_output_text.setAcceptRichText(False)
         self.grbl_output_text.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
         self.grbl_output_text.setObjectName("grblOutputText")
         self.grbl_output_text.setMinimumHeight(100)
+        self.grbl_output_text.document().setMaximumBlockCount(2000) # Keep only the last 2000 lines
         gcode_console_layout.addWidget(QLabel('GRBL Output (Console):'))
         gcode_console_layout.addWidget(self.grbl_output_text)
         
@@ -347,15 +1050,23 @@ class LaserControllerApp(QWidget):
         preview_layout.setContentsMargins(10, 20, 10, 10)
         
         self.graphics_scene = QGraphicsScene(self)
+        # The scene only holds a handful of large path items, a BSP index would just add upkeep
+        self.graphics_scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
         self.graphics_scene.setSceneRect(0, 0, 150, 150)
         
         self.graphics_view = QGraphicsView(self.graphics_scene, self)
         self.graphics_view.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # The few path items cover most of the view, so repainting it whole is cheaper than
+        # computing dirty regions; with full repaints the antialiasing margins are not needed
+        self.graphics_view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        self.graphics_view.setOptimizationFlags(QGraphicsView.OptimizationFlag.DontSavePainterState |
+                                                QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing)
         self.graphics_view.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
         self.graphics_view.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
         self.graphics_view.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.graphics_view.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
         self.graphics_view.wheelEvent = self.graphics_view_wheelEvent
+        self.graphics_view.showEvent = self.graphics_view_showEvent
         self.graphics_view.setMinimumSize(400, 400)
 
         preview_layout.addWidget(self.graphics_view)
@@ -367,240 +1078,78 @@ class LaserControllerApp(QWidget):
         self.update_ui_state(False)
         self.preview_gcode([]) # Draw initial empty grid
 
-    def apply_styles(self):
-        """Applies a dark, professional QSS theme to the application."""
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #2e2e2e; /* Dark background */
-                color: #e0e0e0; /* Light grey text */
-                font-family: 'Segoe UI', 'Roboto', 'Helvetica Neue', Arial, sans-serif;
-                font-size: 13px; /* Slightly smaller base font */
-            }
-
-            QGroupBox {
-                background-color: #3b3b3b; /* Slightly lighter group background */
-                border: 1px solid #505050;
-                border-radius: 6px; /* Slightly more rounded corners */
-                margin-top: 1.5ex; /* Space for title */
-                font-weight: bold;
-                color: #f0f0f0; /* Group title color */
-                padding: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                padding: 0 5px;
-                color: #a0a0a0; /* Subtler title color */
-                font-size: 14px;
-                font-weight: bold;
-            }
-
-            QLabel {
-                color: #d0d0d0;
-            }
-            QLabel#statusLabel { /* Specific style for status label */
-                font-weight: bold;
-                color: #cccccc; /* Default neutral color */
-            }
-            QLabel#posLabel { /* Specific style for position label */
-                font-family: 'Consolas', 'Courier New', monospace; /* Monospaced for coordinates */
-                font-size: 13px;
-                color: #90ee90; /* Light green for position */
-            }
-
-            QPushButton {
-                background-color: #555555;
-                color: #ffffff;
-                border: 1px solid #777777;
-                border-radius: 4px;
-                padding: 7px 14px; /* Slightly more padding */
-                min-height: 30px; /* Consistent height */
-                font-size: 13px;
-                outline: none; /* Remove focus outline */
-            }
-            QPushButton:hover {
-                background-color: #666666;
-                border-color: #999999;
-            }
-            QPushButton:pressed {
-                background-color: #444444;
-                border-color: #aaaaaa;
-            }
-            QPushButton:disabled {
-                background-color: #383838;
-                color: #777777;
-                border-color: #555555;
-            }
-
-            QComboBox {
-                background-color: #3a3a3a;
-                color: #e0e0e0;
-                border: 1px solid #555;
-                border-radius: 3px;
-                padding: 5px; /* More padding */
-                selection-background-color: #007acc; /* Highlight for selected item */
-                min-height: 30px; /* Consistent height */
-            }
-            QComboBox::drop-down {
-                border: 0px; /* No border for the arrow button */
-                width: 20px; /* Make dropdown arrow area larger */
-                subcontrol-origin: padding;
-                subcontrol-position: center right;
-            }
-            QComboBox::down-arrow {
-                image: url(data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIHdpZHRoPSIxNiIgaGVpZ2h0PSIxNiIgdmlld0JveD0iMCAwIDE2IDE2Ij48cGF0aCBmaWxsPSIjRTBFMEUwIiBkPSJNNi42IDExLjZMMyAxMmwxLTIuNmEzIDMgMCAwIDAgMCAuNiAxIDEgMCAwIDAgLjguMiA2IDYgMCAwIDEtNiAxMC42IDYgNiAwIDAgMS02IDZhMSAxIDAgMCAwLS44LS4xIDMgMyAwIDAgMC0uMS0uNyAzIDMgMCAwIDAgLjctLjEgMSAxIDAgMCAwLS41LS43djExLjZ6IiB0cmFuc2Zvcm09InJvdGF0ZSgxODBIDEg4IDgpIiAvPjwvc3ZnPg==); /* Simple white down arrow */
-                width: 12px;
-                height: 12px;
-            }
-            QComboBox QAbstractItemView { /* Styling for dropdown list items */
-                background-color: #3a3a3a;
-                color: #e0e0e0;
-                border: 1px solid #555;
-                selection-background-color: #007acc;
-            }
-
-            QLineEdit {
-                background-color: #3a3a3a;
-                color: #e0e0e0;
-                border: 1px solid #555;
-                border-radius: 3px;
-                padding: 6px; /* More padding */
-                min-height: 30px; /* Consistent height */
-            }
-            QLineEdit:focus {
-                border: 1px solid #0099ff; /* Brighter highlight on focus */
-                background-color: #424242; /* Slightly brighter when focused */
-            }
-
-            QTextEdit {
-                background-color: #222222; /* Even darker for console/code */
-                color: #f0f0f0; /* Default text color for general input */
-                border: 1px solid #444;
-                border-radius: 3px;
-                padding: 8px; /* More padding */
-                font-family: 'Consolas', 'Fira Code', 'Roboto Mono', monospace; /* Monospaced font for code */
-                font-size: 13px;
-            }
-            QTextEdit::placeholder {
-                color: #888888;
-            }
-            QTextEdit#grblOutputText { /* Specific style for GRBL output */
-                color: #00e6e6; /* Cyan for GRBL responses */
-            }
-
-            QSlider::groove:horizontal {
-                border: 1px solid #555;
-                height: 6px; /* thinner groove */
-                background: #4a4a4a;
-                margin: 2px 0;
-                border-radius: 3px;
-            }
-
-            QSlider::handle:horizontal {
-                background: #0099ff; /* Professional blue accent color */
-                border: 1px solid #006bb3;
-                width: 16px; /* smaller handle */
-                margin: -5px 0; 
-                border-radius: 8px;
-            }
-            QSlider::handle:horizontal:hover {
-                background: #00b3ff;
-            }
-            QSlider::add-page:horizontal {
-                background: #555;
-                border-radius: 3px;
-            }
-            QSlider::sub-page:horizontal {
-                background: #007acc; /* Slightly darker blue for filled part */
-                border-radius: 3px;
-            }
-            QSlider::tick-mark {
-                background: #777;
-                width: 1px;
-                height: 6px; /* vertical tick marks */
-                margin-top: 0px; /* center vertical axis */
-            }
-
-            QGraphicsView {
-                background-color: #1c1c1c; /* Very dark background for the drawing area */
-                border: 1px solid #444;
-                border-radius: 5px;
-            }
-            
-            QScrollArea {
-                border: none; /* No border for the scroll area itself */
-            }
-            QScrollArea > QWidget > QWidget { /* Targeting the inner widget of scroll area */
-                background-color: #2e2e2e; /* Match main background */
-            }
-            
-            /* Scrollbar styling for a cleaner look */
-            QScrollBar:vertical {
-                border: 1px solid #3a3a3a;
-                background: #2a2a2a;
-                width: 12px;
-                margin: 0px 0px 0px 0px;
-                border-radius: 6px;
-            }
-            QScrollBar::handle:vertical {
-                background: #505050;
-                min-height: 20px;
-                border-radius: 5px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background: #606060;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                background: none;
-            }
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
-                background: none;
-            }
-
-            QProgressBar {
-                border: 1px solid #505050;
-                border-radius: 5px;
-                text-align: center;
-                color: #e0e0e0;
-                background-color: #4a4a4a;
-            }
-            QProgressBar::chunk {
-                background-color: #007acc;
-                border-radius: 4px;
-            }
-
-        """)
-        
+    def _build_quick_commands_group(self):
+        """Builds the Quick Commands group into its placeholder; only needed once connected."""
+        if self.quick_commands_group is not None:
+            return
+        self.setUpdatesEnabled(False) # Avoid repainting the half-built group
+        quick_commands_group = QGroupBox('Quick Commands (Macros)', self)
+        quick_commands_layout = QGridLayout(quick_commands_group)
+        quick_commands_layout.setSpacing(8)
+        quick_commands_layout.setContentsMargins(10, 20, 10, 10)
+
+        self.btn_home_macro = QPushButton('Home ($H)', self)
+        self.btn_home_macro.clicked.connect(partial(self.send_command, '$H'))
+        quick_commands_layout.addWidget(self.btn_home_macro, 0, 0)
+
+        self.btn_goto_zero = QPushButton('Go to Zero (G0 X0Y0Z0)', self)
+        self.btn_goto_zero.clicked.connect(partial(self.send_command, 'G0 X0 Y0 Z0'))
+        quick_commands_layout.addWidget(self.btn_goto_zero, 0, 1)
+
+        self.btn_soft_reset_macro = QPushButton('Soft Reset (Ctrl-X)', self)
+        self.btn_soft_reset_macro.clicked.connect(partial(self.send_command, '\x18'))
+        quick_commands_layout.addWidget(self.btn_soft_reset_macro, 1, 0)
+
+        self.btn_unlock_macro = QPushButton('Unlock ($X)', self)
+        self.btn_unlock_macro.clicked.connect(partial(self.send_command, '$X'))
+        quick_commands_layout.addWidget(self.btn_unlock_macro, 1, 1)
+
+        self.btn_grbl_settings = QPushButton('GRBL Settings ($$)', self)
+        self.btn_grbl_settings.clicked.connect(partial(self.send_command, '$$'))
+        quick_commands_layout.addWidget(self.btn_grbl_settings, 2, 0)
+
+        self.btn_grbl_parser_state = QPushButton('Parser State ($G)', self)
+        self.btn_grbl_parser_state.clicked.connect(partial(self.send_command, '$G'))
+        quick_commands_layout.addWidget(self.btn_grbl_parser_state, 2, 1)
+
+        self.btn_laser_test_on = QPushButton('Laser Test ON (S10)', self)
+        self.btn_laser_test_on.clicked.connect(partial(self.send_command, 'M3 S10'))
+        quick_commands_layout.addWidget(self.btn_laser_test_on, 3, 0)
+
+        self.btn_laser_test_off = QPushButton('Laser Test OFF (M5)', self)
+        self.btn_laser_test_off.clicked.connect(partial(self.send_command, 'M5 S0'))
+        quick_commands_layout.addWidget(self.btn_laser_test_off, 3, 1)
+
+        self._quick_commands_placeholder.layout().addWidget(quick_commands_group)
+        self.quick_commands_group = quick_commands_group
+        self.setUpdatesEnabled(True)
+
     def update_ui_state(self, connected):
         """Updates the enabled/disabled state of UI elements based on connection status."""
         is_image_selected = (self.image_path is not None)
+        # While a job streams, other buffered commands are refused (only Soft Reset stays available)
+        commands_allowed = connected and not self._gcode_job_active
 
-        self.send_gcode_button.setEnabled(connected)
+        self.send_gcode_button.setEnabled(commands_allowed)
         
-        jogging_allowed = connected and (self.grbl_status in ["Idle", "Jog"]) 
+        jogging_allowed = commands_allowed and (self.grbl_status in ["Idle", "Jog"]) 
         self.jog_btn_x_minus.setEnabled(jogging_allowed)
         self.jog_btn_x_plus.setEnabled(jogging_allowed)
         self.jog_btn_y_minus.setEnabled(jogging_allowed)
         self.jog_btn_y_plus.setEnabled(jogging_allowed)
         self.jog_btn_z_minus.setEnabled(jogging_allowed)
         self.jog_btn_z_plus.setEnabled(jogging_allowed)
-        self.jog_btn_home.setEnabled(connected)
-        self.jog_btn_set_origin.setEnabled(connected)
+        self.jog_btn_home.setEnabled(commands_allowed)
+        self.jog_btn_set_origin.setEnabled(commands_allowed)
         
-        self.jog_btn_unlock.setEnabled(connected)
+        self.jog_btn_unlock.setEnabled(commands_allowed)
         self.jog_btn_soft_reset.setEnabled(connected)
         # Quick Command Macros
-        self.btn_home_macro.setEnabled(connected)
-        self.btn_goto_zero.setEnabled(connected)
-        self.btn_soft_reset_macro.setEnabled(connected)
-        self.btn_unlock_macro.setEnabled(connected)
-        self.btn_grbl_settings.setEnabled(connected)
-        self.btn_grbl_parser_state.setEnabled(connected)
-        self.btn_laser_test_on.setEnabled(connected)
-        self.btn_laser_test_off.setEnabled(connected)
-
-        self.laser_power_slider.setEnabled(connected)
-        self.feed_rate_slider.setEnabled(connected)
+        if self.quick_commands_group is not None:
+            self.quick_commands_group.setEnabled(commands_allowed)
+
+        self.laser_power_slider.setEnabled(commands_allowed)
+        self.feed_rate_slider.setEnabled(commands_allowed)
         self.jog_step_input.setEnabled(connected)
         self.laser_threshold_input.setEnabled(connected)
         self.preview_resolution_input.setEnabled(connected)
@@ -609,7 +1158,15 @@ class LaserControllerApp(QWidget):
         
         if connected:
             self.connect_button.setText('Disconnect')
-            self.status_label.setStyleSheet("font-weight: bold; color: #90ee90;")
+            # The status colour follows GRBL's state; green until the first status report
+            if self.grbl_status in ("Idle", "Disconnected"):
+                self.status_label.setStyleSheet("font-weight: bold; color: #90ee90;")
+            elif self.grbl_status == "Run" or self.grbl_status == "Jog":
+                self.status_label.setStyleSheet("font-weight: bold; color: #00bfff;") # Deep Sky Blue
+            elif self.grbl_status == "Hold" or self.grbl_status == "Alarm":
+                self.status_label.setStyleSheet("font-weight: bold; color: #ff4500;") # Orange Red
+            else:
+                self.status_label.setStyleSheet("font-weight: bold; color: #cccccc;") # Default neutral color
         else:
             self.connect_button.setText('Connect')
             self.status_label.setStyleSheet("font-weight: bold; color: #ff6347;")
@@ -637,53 +1194,85 @@ class LaserControllerApp(QWidget):
 
     def connect_serial(self):
         """Attempts to connect to the selected serial port."""
+        self._reconnect_timer.stop() # A manual attempt replaces a scheduled one
         selected_port_path = self.port_combo.currentData()
         if not selected_port_path:
             QMessageBox.warning(self, "Connection Error", "Please select a serial port.")
             return
 
         self.serial_port.setPortName(selected_port_path)
-        self.serial_port.setBaudRate(115200)
+        self.serial_port.setBaudRate(self.baud_rate_combo.currentData())
         self.serial_port.setDataBits(QSerialPort.DataBits.Data8)
         self.serial_port.setParity(QSerialPort.Parity.NoParity)
         self.serial_port.setStopBits(QSerialPort.StopBits.OneStop)
         self.serial_port.setFlowControl(QSerialPort.FlowControl.NoFlowControl)
+        # Unlimited read buffer: a burst of replies is always taken in full by one readAll()
+        self.serial_port.setReadBufferSize(0)
 
         if self.serial_port.open(QIODevice.OpenModeFlag.ReadWrite):
             self.status_label.setText(f'Status: Attempting to connect to: {self.port_combo.currentText()}...')
             self.connect_button.setEnabled(False)
-            self.grbl_response_buffer = ""
+            self.grbl_response_buffer.clear()
+            self._rx_carry.clear()
             self.serial_port.readyRead.connect(self._read_grbl_detection_data)
             self.serial_port.write(b'\n') # Send newline to wake up GRBL
-            self.grbl_detect_timer.start(2000) # Wait 2 seconds for GRBL response
+            self.grbl_detect_timer.start(2000) # Wait up to 2 seconds for GRBL response
         else:
             self.status_label.setText(f'Status: Connection failed: {self.serial_port.errorString()}')
             self.connect_button.setEnabled(True)
             self.update_ui_state(False)
-            QMessageBox.critical(self, "Connection Error", f"Failed to connect to {self.port_combo.currentText()}:\n{self.serial_port.errorString()}")
+            if not self._schedule_reconnect():
+                QMessageBox.critical(self, "Connection Error", f"Failed to connect to {self.port_combo.currentText()}:\n{self.serial_port.errorString()}")
+
+    def _schedule_reconnect(self):
+        """Schedules the next connection attempt if auto-reconnect is on; returns whether it did."""
+        if not self.auto_reconnect_checkbox.isChecked():
+            return False
+        self.status_label.setText(f'{self.status_label.text()} - retrying in {self._reconnect_delay_ms / 1000:.1f} s')
+        self._reconnect_timer.start(self._reconnect_delay_ms)
+        self._reconnect_delay_ms = min(RECONNECT_DELAY_MAX_MS, int(self._reconnect_delay_ms * 1.5))
+        return True
+
+    def _on_auto_reconnect_toggled(self, checked):
+        """Cancels a pending retry when auto-reconnect is switched off."""
+        if not checked:
+            self._reconnect_timer.stop()
+            self._reconnect_delay_ms = RECONNECT_DELAY_MIN_MS
 
     def _read_grbl_detection_data(self):
         """Reads data specifically for GRBL detection during connection."""
-        while self.serial_port.bytesAvailable():
-            data = self.serial_port.readAll().data().decode('utf-8', errors='ignore')
-            self.grbl_response_buffer += data
-            self.grbl_output_text.append(f"<span style='color: #88dd88;'>[INFO] Waiting for GRBL: {data.strip()}</span>")
+        # A single readAll() drains everything the port has buffered
+        data = self.serial_port.readAll().data()
+        self.grbl_response_buffer += data
+        if data.strip():
+            self._log(f"[INFO] Waiting for GRBL: {data.decode('utf-8', errors='ignore').strip()}", "info")
+
+        # Finish detection as soon as the complete banner line (e.g. "Grbl 1.1h ['$' for help]") is in
+        banner_start = self.grbl_response_buffer.find(b"Grbl")
+        if banner_start >= 0 and self.grbl_response_buffer.find(b'\n', banner_start) >= 0:
+            self.grbl_detect_timer.stop()
+            self._check_grbl_response()
 
     def _check_grbl_response(self):
-        """Checks the buffered response for GRBL signature after timer expires."""
+        """Checks the buffered response for GRBL signature once the banner arrives or the timer expires."""
         try:
             self.serial_port.readyRead.disconnect(self._read_grbl_detection_data)
         except TypeError: # Handle case where disconnect is called twice
             pass
         
-        if "Grbl" in self.grbl_response_buffer:
-            grbl_version_match = re.search(r"Grbl ([0-9.]+)", self.grbl_response_buffer)
+        response = self.grbl_response_buffer.decode('utf-8', errors='ignore') # Decoded once, at the end
+        if "Grbl" in response:
+            grbl_version_match = _GRBL_VER_RE.search(response)
             grbl_version = grbl_version_match.group(1) if grbl_version_match else "N/A"
             self.status_label.setText(f'Status: Connected to: {self.serial_port.portName()} (GRBL v{grbl_version})')
             self.connect_button.setText('Disconnect')
+            self._reconnect_delay_ms = RECONNECT_DELAY_MIN_MS
+            self.grbl_status = "Disconnected" # Unknown until the first status report
+            self._last_status_report = None
+            self._build_quick_commands_group()
             self.update_ui_state(True)
             self.serial_port.readyRead.connect(self.read_data) # Connect to regular data reading
-            self.status_timer.start(200) # Start requesting status updates
+            self.status_timer.start(STATUS_POLL_ACTIVE_MS) # Start requesting status updates
             QMessageBox.information(self, "Connection Successful", "GRBL Controller detected and connected successfully!")
             self.send_command("$$") # Request GRBL settings
             self.send_command("$G") # Request G-code parser state
@@ -693,24 +1282,27 @@ class LaserControllerApp(QWidget):
             self.connect_button.setText('Connect')
             self.connect_button.setEnabled(True)
             self.update_ui_state(False)
-            QMessageBox.critical(self, "Detection Failed", "No GRBL Controller detected on this port. Please check port or GRBL power.")
+            if not self._schedule_reconnect():
+                QMessageBox.critical(self, "Detection Failed", "No GRBL Controller detected on this port. Please check port or GRBL power.")
 
     def disconnect_serial(self):
         """Disconnects from the serial port."""
+        self._reconnect_timer.stop() # A manual disconnect sticks
+        self._reconnect_delay_ms = RECONNECT_DELAY_MIN_MS
         if self.serial_port.isOpen():
             self.serial_port.close()
             self.status_label.setText('Status: Disconnected')
             self.connect_button.setText('Connect')
+            self.grbl_status = "Disconnected"
             self.update_ui_state(False)
             self.status_timer.stop()
-            self.gcode_send_timer.stop()
-            self.gcode_to_send_queue = [] # Clear any pending commands
-            self.gcode_lines_sent = 0
-            self.gcode_current_line_index = -1
+            self._ui_refresh.stop() # Don't let a late status report overwrite 'Disconnected'
+            self._pending_status_text = None
+            self._pending_pos_text = None
+            self._pending_lens.clear() # Nothing sent will be acknowledged any more
+            self._pending_bytes = 0
+            self._stop_gcode_transmission() # Clear any pending commands
             self.total_gcode_lines = 0
-            self.progress_bar.setValue(0)
-            self.estimated_time_label.setText("Estimated Time: --:--:--")
-            self._highlight_gcode_line(-1) # Clear highlighting
             try:
                 self.serial_port.readyRead.disconnect(self.read_data)
             except TypeError:
@@ -724,118 +1316,260 @@ class LaserControllerApp(QWidget):
 
     def read_data(self):
         """
-        Reads data from the serial port, displays it, parses GRBL status,
-        and triggers the sending of the next G-code command if 'ok' or 'error' is received.
+        Reads all available serial data and handles every complete GRBL line in it.
+        A trailing partial line is kept in the receive carry until the rest arrives.
         """
-        while self.serial_port.bytesAvailable():
-            data = self.serial_port.readAll().data().decode('utf-8', errors='ignore').strip()
-            
-            if data.startswith('<'):
-                # GRBL real-time status report
-                self.grbl_output_text.append(f"<span style='color: #00ffff;'>GRBL Status: {data}</span>")
-                self.parse_grbl_status(data)
-            elif data.startswith('ok'):
-                # Command successfully executed
-                self.grbl_output_text.append(f"<span style='color: #00ff00;'>GRBL: {data}</span>")
-                if self.gcode_to_send_queue:
-                    self.gcode_lines_sent += 1
-                    self.update_gcode_progress()
-                    # Trigger sending next command after 'ok'
-                    if not self.gcode_send_timer.isActive():
-                        self.gcode_send_timer.start(5) # Small delay to avoid flooding
-                else:
-                    # All commands sent and finished, if 'ok' comes when queue is empty
-                    self.progress_bar.setValue(100)
-                    elapsed_time = time.time() - self.gcode_start_time
-                    self.estimated_time_label.setText(f"Completed in: {self._format_time(elapsed_time)}")
-                    self._highlight_gcode_line(-1) # Clear highlighting
-                    QMessageBox.information(self, "G-code Complete", "G-code transmission finished!")
-
-            elif data.startswith('error'):
-                # GRBL reported an error
-                self.grbl_output_text.append(f"<span style='color: red;'>GRBL Error: {data}</span>")
-                self.gcode_send_timer.stop()
-                self.gcode_to_send_queue.clear()
-                self.gcode_lines_sent = 0
-                self.gcode_current_line_index = -1
-                self.progress_bar.setValue(0)
-                self.estimated_time_label.setText("Estimated Time: --:--:--")
-                self._highlight_gcode_line(-1) # Clear highlighting
-                QMessageBox.critical(self, "GRBL Error", f"GRBL reported an error: {data}\nG-code transmission stopped.")
-            else:
-                # Other GRBL messages
-                self.grbl_output_text.append(f"GRBL: {data}")
-            
-            self.grbl_output_text.verticalScrollBar().setValue(self.grbl_output_text.verticalScrollBar().maximum())
-            
+        self._rx_carry += bytes(self.serial_port.readAll())
+        *lines, self._rx_carry = self._rx_carry.split(b'\n')
+        for raw in lines:
+            data = raw.decode('utf-8', errors='ignore').strip()
+            if data:
+                self._line_handlers.get(data[0], self._handle_other)(data)
+
+    def _handle_status(self, data):
+        """Handles a GRBL real-time status report."""
+        self._log(f"GRBL Status: {data}", "status")
+        self.parse_grbl_status(data)
+
+    def _handle_ok(self, data):
+        """Handles a command acknowledgement and sends the next G-code lines that fit."""
+        self._log(f"GRBL: {data}", "ok")
+        self.request_grbl_status() # Follow progress while GRBL is working through commands
+        if self._pending_lens:
+            streamed = self._release_oldest_pending()
+            if streamed:
+                self.gcode_lines_sent += 1
+                self._progress_dirty = True
+                self._schedule_ui_refresh()
+            if self._gcode_next_line is not None:
+                self._send_next_gcode_command()
+            elif streamed and not self._pending_streamed:
+                # All commands sent and acknowledged
+                self._finish_gcode_transmission()
+
+    def _handle_error(self, data):
+        """Handles a GRBL error, stopping the G-code transmission if a streamed line failed."""
+        self._log(f"GRBL Error: {data}", "error")
+        streamed = bool(self._pending_lens) and self._release_oldest_pending() # The failed line has left GRBL's buffer
+        if streamed:
+            # The job lines behind it are still buffered and would run, so GRBL is halted and flushed
+            self._soft_reset(feed_hold=True)
+            QMessageBox.critical(self, "GRBL Error", f"GRBL reported an error: {data}\n"
+                                 "G-code transmission stopped and GRBL was reset.")
+        else:
+            QMessageBox.critical(self, "GRBL Error", f"GRBL reported an error: {data}")
+
+    def _release_oldest_pending(self):
+        """Frees the space of the oldest unacknowledged line; returns whether it was a streamed one."""
+        streamed = len(self._pending_lens) <= self._pending_streamed
+        self._pending_bytes -= self._pending_lens.popleft()
+        if streamed:
+            self._pending_streamed -= 1
+        return streamed
+
+    def _handle_other(self, data):
+        """Displays any other GRBL message (settings, parser state, alarms...)."""
+        self._log(f"GRBL: {data}")
+
+    def _log(self, text, kind="plain"):
+        """Queues a line for the GRBL console, coloured by kind (see _log_formats); see _flush_log."""
+        self._log_buffer.append((text, self._log_formats[kind]))
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+
+    def _flush_log(self):
+        """Appends all queued console lines at once and keeps the view at the end if it was there."""
+        if not self._log_buffer:
+            return
+        scroll_bar = self.grbl_output_text.verticalScrollBar()
+        follow = scroll_bar.value() >= scroll_bar.maximum() - scroll_bar.pageStep() # Not scrolled up by the user
+        document = self.grbl_output_text.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock() # One layout update for the whole batch
+        new_block = not document.isEmpty()
+        for text, log_format in self._log_buffer:
+            if new_block:
+                cursor.insertBlock()
+            cursor.insertText(text, log_format)
+            new_block = True
+        cursor.endEditBlock()
+        self._log_buffer.clear()
+        if follow:
+            scroll_bar.setValue(scroll_bar.maximum())
+
     def send_command(self, command):
         """Sends a single command to GRBL, ensuring it's written."""
         if not self.serial_port.isOpen():
             QMessageBox.warning(self, "Error", "Not connected to Arduino. Please connect first.")
             return
+
+        if command == '\x18':
+            self._soft_reset()
+            return
+
+        if self._gcode_job_active:
+            QMessageBox.warning(self, "G-code Running", "Please wait for the G-code transmission to finish.")
+            return
         
-        command_b = (command + '\n').encode('utf-8')
+        payload = (command + '\n').encode('utf-8')
+        if self._send_raw(payload):
+            # Counted like streamed lines, so a job started before its 'ok' still fits GRBL's buffer
+            self._pending_lens.append(len(payload))
+            self._pending_bytes += len(payload)
+            self._log(f"Sent: {command}", "sent")
+
+    def _soft_reset(self, feed_hold=False):
+        """
+        Soft resets GRBL, which flushes its buffer and so ends any job. feed_hold first sends '!'
+        to stop the current motion. Both are real-time commands, executed without waiting in the buffer.
+        """
+        if self._send_raw(b'!\x18' if feed_hold else b'\x18'):
+            self._log("Sent: Feed Hold (!), Soft Reset (Ctrl-X)" if feed_hold else "Sent: Soft Reset (Ctrl-X)", "sent")
+            self._pending_lens.clear()
+            self._pending_bytes = 0
+            self._stop_gcode_transmission()
+
+    def _send_raw(self, payload):
+        """Writes already encoded bytes to GRBL without logging them; returns whether it succeeded."""
         try:
-            self.serial_port.write(command_b)
-            self.grbl_output_text.append(f"<span style='color: #ffff00;'>Sent: {command}</span>")
-            self.grbl_output_text.verticalScrollBar().setValue(self.grbl_output_text.verticalScrollBar().maximum())
+            self.serial_port.write(payload)
         except Exception as e:
             QMessageBox.critical(self, "Send Error", f"Failed to send command: {e}")
+            return False
+        return True
+
+    @property
+    def _gcode_job_active(self):
+        """Whether G-code is still queued or streamed lines still await GRBL's 'ok'."""
+        return self._gcode_next_line is not None or self._pending_streamed > 0
+
+    def _stop_gcode_transmission(self):
+        """
+        Drops the G-code still to be sent and resets the progress. Lines already in GRBL's buffer
+        stay counted in _pending_lens, but their 'ok's no longer count as progress.
+        """
+        self._queue_gcode(())
+        self._pending_streamed = 0
+        self.gcode_lines_sent = 0
+        self.gcode_current_line_index = -1
+        self._progress_dirty = False
+        self.progress_bar.setValue(0)
+        self.estimated_time_label.setText("Estimated Time: --:--:--")
+        self._highlight_gcode_line(-1) # Clear highlighting
+        self.update_ui_state(self.serial_port.isOpen())
+
+    def _queue_gcode(self, lines):
+        """Replaces the G-code waiting to be sent with lines (a list, generator or open file)."""
+        self._gcode_iter = iter(lines)
+        self._gcode_next_line = next(self._gcode_iter, None)
 
     def _send_next_gcode_command(self):
-        """Sends the next G-code command from the queue."""
-        if self.gcode_to_send_queue:
-            command = self.gcode_to_send_queue.pop(0)
-            self.gcode_current_line_index += 1 # Increment for highlighting the next line
-            self.send_command(command)
+        """
+        Streams queued G-code using GRBL's character-counting protocol: sends lines as long as
+        they fit in GRBL's receive buffer, and is called again each time an 'ok' frees space.
+        """
+        # A send error dialog runs a nested event loop in which more 'ok's can arrive
+        if self._sending_gcode:
+            return
+        self._sending_gcode = True
+        try:
+            self._send_gcode_batch()
+        finally:
+            self._sending_gcode = False
+
+    def _send_gcode_batch(self):
+        """Sends as many queued lines as fit in GRBL's receive buffer, in a single write."""
+        batch = [] # Lines that fit in GRBL's buffer, written with a single write() call
+        while self._gcode_next_line is not None:
+            command = self._gcode_next_line
+            line_len = len(command) + 1 # Including the trailing newline
+            if (batch or self._pending_lens) and self._pending_bytes + line_len > GRBL_RX_BUFFER_SIZE:
+                break # GRBL's buffer is full, wait for the next 'ok'
+            self._gcode_next_line = next(self._gcode_iter, None)
+            batch.append(command)
+            self._pending_lens.append(line_len)
+            self._pending_bytes += line_len
+            self._pending_streamed += 1
+
+        # Streamed lines are not echoed to the console, the editor highlight shows the progress
+        if batch and self._send_raw(('\n'.join(batch) + '\n').encode('utf-8')):
+            self.gcode_current_line_index += len(batch) # Advance highlighting to the last line sent
             self._highlight_gcode_line(self.gcode_current_line_index)
-            # Update preview dynamically for movements (G0, G1)
-            # self._update_preview_path(command) # This function will be called by status reports
-        else:
-            self.gcode_send_timer.stop() # Stop timer if queue is empty
-            # Final progress update if not already done by 'ok' response
-            if self.progress_bar.value() < 100:
-                self.progress_bar.setValue(100)
-                elapsed_time = time.time() - self.gcode_start_time
-                self.estimated_time_label.setText(f"Completed in: {self._format_time(elapsed_time)}")
-                self._highlight_gcode_line(-1) # Clear highlighting
-                QMessageBox.information(self, "G-code Complete", "G-code transmission finished!")
+
+    def _finish_gcode_transmission(self):
+        """Final progress update once every streamed G-code line has been acknowledged."""
+        self._progress_dirty = False # Supersedes the pending estimate
+        self.progress_bar.setValue(100)
+        elapsed_time = time.time() - self.gcode_start_time
+        self.estimated_time_label.setText(f"Completed in: {self._format_time(elapsed_time)}")
+        self._highlight_gcode_line(-1) # Clear highlighting
+        self.update_ui_state(self.serial_port.isOpen())
+        QMessageBox.information(self, "G-code Complete", "G-code transmission finished!")
 
 
     def parse_grbl_status(self, status_string):
         """Parses the GRBL status string and updates UI."""
         # Example: <Idle|WPos:0.000,0.000,0.000|Bf:15,128|FS:0,0|Ov:100,100,100|A:S>
+        # A machine at rest repeats the same report on every poll; there is nothing new to parse
+        if status_string == self._last_status_report:
+            return
+        self._last_status_report = status_string
         
         # Extract status (e.g., Idle, Run, Hold, Jog, Alarm)
-        status_match = re.search(r'<(Idle|Run|Hold|Jog|Alarm|Check|Door|Home|Sleep)', status_string)
-        if status_match:
+        # The state stays the same for minutes during a job, so the UI is only touched when it changes
+        status_match = _STATUS_RE.match(status_string)
+        if status_match and status_match.group(1) != self.grbl_status:
             self.grbl_status = status_match.group(1)
-            self.status_label.setText(f'Status: {self.grbl_status}')
-            if self.grbl_status == "Idle":
-                self.status_label.setStyleSheet("font-weight: bold; color: #90ee90;")
-            elif self.grbl_status == "Run" or self.grbl_status == "Jog":
-                self.status_label.setStyleSheet("font-weight: bold; color: #00bfff;") # Deep Sky Blue
-            elif self.grbl_status == "Hold" or self.grbl_status == "Alarm":
-                self.status_label.setStyleSheet("font-weight: bold; color: #ff4500;") # Orange Red
+            # Poll faster only while the machine is doing something
+            if self.grbl_status in ("Idle", "Alarm", "Sleep"):
+                poll_interval = STATUS_POLL_IDLE_MS
             else:
-                self.status_label.setStyleSheet("font-weight: bold; color: #cccccc;") # Default neutral color
+                poll_interval = STATUS_POLL_ACTIVE_MS
+            if self.status_timer.isActive() and self.status_timer.interval() != poll_interval:
+                self.status_timer.setInterval(poll_interval)
+            self._pending_status_text = f'Status: {self.grbl_status}'
+            self.update_ui_state(self.serial_port.isOpen()) # Jogging and the status colour depend on the state
         
         # Extract Work Position (WPos)
-        wpos_match = re.search(r'WPos:([-\d.]+),([-\d.]+),([-\d.]+)', status_string)
+        wpos_match = _WPOS_RE.search(status_string)
         if wpos_match:
-            self.current_x = float(wpos_match.group(1))
-            self.current_y = float(wpos_match.group(2))
-            self.current_z = float(wpos_match.group(3))
-            self.pos_label.setText(f'Position (WPos): X: {self.current_x:.2f} Y: {self.current_y:.2f} Z: {self.current_z:.2f}')
+            position = (float(wpos_match.group(1)), float(wpos_match.group(2)), float(wpos_match.group(3)))
+            if position != (self.current_x, self.current_y, self.current_z):
+                self.current_x, self.current_y, self.current_z = position
+                self._pending_pos_text = f'Position (WPos): X: {self.current_x:.2f} Y: {self.current_y:.2f} Z: {self.current_z:.2f}'
+
+        if self._pending_status_text is not None or self._pending_pos_text is not None:
+            self._schedule_ui_refresh()
+
+    def _schedule_ui_refresh(self):
+        """Starts the coalescing UI refresh timer, unless an update is already scheduled."""
+        if not self._ui_refresh.isActive():
+            self._ui_refresh.start()
+
+    def _refresh_ui(self):
+        """Pushes everything that changed since the last refresh to the widgets, once."""
+        if self._pending_status_text is not None and self._pending_status_text != self.status_label.text():
+            self.status_label.setText(self._pending_status_text)
+        if self._pending_pos_text is not None:
+            if self._pending_pos_text != self.pos_label.text():
+                self.pos_label.setText(self._pending_pos_text)
             self._update_preview_current_position() # Update the dot on preview
-
-        self.update_ui_state(self.serial_port.isOpen()) # Update button states based on new status
-
+        self._pending_status_text = None
+        self._pending_pos_text = None
+        if self._progress_dirty:
+            self._progress_dirty = False
+            self.update_gcode_progress()
+        if self._highlight_dirty:
+            self._highlight_dirty = False
+            self._apply_gcode_line_highlight()
 
     def request_grbl_status(self):
-        """Requests a status report from GRBL."""
-        if self.serial_port.isOpen():
+        """Requests a status report from GRBL, at most once per STATUS_REQUEST_MIN_INTERVAL."""
+        now = time.monotonic()
+        if self.serial_port.isOpen() and now - self._last_status_request >= STATUS_REQUEST_MIN_INTERVAL:
             self.serial_port.write(b'?') # '?' is the real-time status report request
+            self._last_status_request = now
 
 
     def send_jog_command(self, dx, dy):
@@ -857,14 +1591,45 @@ class LaserControllerApp(QWidget):
         else:
             QMessageBox.warning(self, "Jogging Not Possible", "Please connect or ensure GRBL is in 'Idle' or 'Jog' state.")
 
-    def update_jog_step(self):
-        """Updates the jogging step from the input field."""
-        try:
-            self.jog_step = float(self.jog_step_input.text())
-        except ValueError:
-            self.jog_step = 1.0 # Fallback to default
-            self.jog_step_input.setText(str(self.jog_step))
-            QMessageBox.warning(self, "Invalid Input", "Please enter a valid number for jog step.")
+    def _input_value(self, line_edit, parse):
+        """Returns the value of a validated input field, or None while its input is not acceptable.
+        parse is QLocale.toDouble or QLocale.toInt, applied in the validator's locale (e.g. a decimal comma)."""
+        if line_edit.hasAcceptableInput():
+            value, ok = parse(line_edit.validator().locale(), line_edit.text())
+            if ok:
+                return value
+        return None
+
+    def _read_input(self, line_edit, parse, description):
+        """Like _input_value, but warns the user when the input is not acceptable."""
+        value = self._input_value(line_edit, parse)
+        if value is None:
+            QMessageBox.warning(self, "Invalid Input", f"Please enter a valid {description}.")
+        return value
+
+    def _read_jog_step(self):
+        """Jog distance in mm, read from the input field at the moment of use; None after a warning."""
+        return self._read_input(self.jog_step_input, QLocale.toDouble, "jog step (0.01-999 mm)")
+
+    def _read_laser_threshold(self):
+        """Pixel intensity threshold for laser ON (0-255); None after a warning."""
+        return self._read_input(self.laser_threshold_input, QLocale.toInt, "laser threshold (0-255)")
+
+    def _read_preview_resolution_ppm(self):
+        """Pixels per millimeter used for image conversion (1-50); None after a warning."""
+        return self._read_input(self.preview_resolution_input, QLocale.toInt, "resolution (1-50 PPM)")
+
+    def _jog_xy(self, sign_x, sign_y):
+        """Jogs X/Y by the jog step currently entered, in the given directions (-1, 0, 1)."""
+        jog_step = self._read_jog_step()
+        if jog_step is not None: # The jog is refused while the step is not acceptable
+            self.send_jog_command(sign_x * jog_step, sign_y * jog_step)
+
+    def _jog_z(self, sign_z):
+        """Jogs Z by the jog step currently entered, in the given direction (-1, 1)."""
+        jog_step = self._read_jog_step()
+        if jog_step is not None:
+            self.send_jog_command_z(sign_z * jog_step)
 
     def set_origin(self):
         """Sends the G92 X0 Y0 Z0 command to set current position as origin."""
@@ -921,214 +1686,177 @@ class LaserControllerApp(QWidget):
                 self.image_path_label.setText("No image selected.")
                 self.convert_to_gcode_button.setEnabled(False)
 
-    def update_laser_threshold(self):
-        """Updates the laser threshold from the input field."""
-        try:
-            self.laser_threshold = int(self.laser_threshold_input.text())
-            if not (0 <= self.laser_threshold <= 255):
-                raise ValueError("Threshold out of range")
-        except ValueError:
-            self.laser_threshold = 200 # Fallback
-            self.laser_threshold_input.setText(str(self.laser_threshold))
-            QMessageBox.warning(self, "Invalid Input", "Laser Threshold must be an integer from 0 to 255.")
-
-    def update_preview_resolution(self):
-        """Updates the preview resolution (pixels per mm) from the input field."""
-        try:
-            self.preview_image_resolution_ppm = int(self.preview_resolution_input.text())
-            if not (1 <= self.preview_image_resolution_ppm <= 50):
-                raise ValueError("Resolution out of range")
-        except ValueError:
-            self.preview_image_resolution_ppm = 5 # Fallback
-            self.preview_resolution_input.setText(str(self.preview_image_resolution_ppm))
-            QMessageBox.warning(self, "Invalid Input", "Resolution must be an integer from 1 to 50.")
-
     def convert_image_to_gcode(self):
         """Converts the selected image to G-code based on settings."""
         if not self.image_path:
             QMessageBox.warning(self, "Error", "Please select an image first.")
             return
 
-        try:
-            target_width_mm = float(self.width_input.text())
-            target_height_mm = float(self.height_input.text())
-            if target_width_mm <= 0 or target_height_mm <= 0:
-                raise ValueError("Dimensions must be positive.")
-        except ValueError:
-            QMessageBox.warning(self, "Invalid Input", "Please enter valid positive values for width and height (in mm).")
+        # Each field warns on its own; the conversion stops at the first one that is not acceptable
+        target_width_mm = self._read_input(self.width_input, QLocale.toDouble, "width (0.1-999 mm)")
+        if target_width_mm is None:
             return
-
-        try:
-            img = Image.open(self.image_path).convert('L') # Convert to grayscale
-        except Exception as e:
-            QMessageBox.critical(self, "Image Loading Error", f"Failed to load image: {e}")
+        target_height_mm = self._read_input(self.height_input, QLocale.toDouble, "height (0.1-999 mm)")
+        if target_height_mm is None:
+            return
+        ppm = self._read_preview_resolution_ppm()
+        if ppm is None:
+            return
+        threshold = self._read_laser_threshold()
+        if threshold is None:
             return
 
         # Calculate pixels based on target mm and PPM
-        img_width_px = int(target_width_mm * self.preview_image_resolution_ppm)
-        img_height_px = int(target_height_mm * self.preview_image_resolution_ppm)
-        
-        # Resize without maintaining aspect ratio to fit the specified dimensions
-        img = img.resize((img_width_px, img_height_px), Image.Resampling.LANCZOS)
-        
-        gcode_commands = []
-        
-        # Initial G-code commands
-        gcode_commands.append("G21")  # Set units to millimeters
-        gcode_commands.append("G90")  # Set absolute positioning
-        gcode_commands.append("G17")  # XY plane
-        gcode_commands.append(f"F{self.feed_rate_slider.value()}") # Set initial feed rate
-        gcode_commands.append("M5 S0") # Ensure laser is off and power is zero at start
-
-        # Iterate through pixels and generate G-code
-        # Using a simple row-by-row (raster) scan with zig-zag movement for efficiency
-        
-        # Start at Y=0 (bottom) and go up. Image origin (0,0) is usually top-left, GRBL (0,0) is bottom-left.
-        # We need to invert Y for G-code if image origin is top-left.
-        
-        for y_px in range(img_height_px):
-            # Map image Y-coordinate to G-code Y-coordinate (invert for bottom-left origin)
-            grbl_y_mm = y_px / self.preview_image_resolution_ppm # No inversion here, assuming image y_px grows downwards
-
-            if y_px % 2 == 0:  # Even row (0, 2, 4...): Left to Right
-                for x_px in range(img_width_px):
-                    grbl_x_mm = x_px / self.preview_image_resolution_ppm
-                    
-                    pixel_intensity = img.getpixel((x_px, y_px)) # Get pixel from PIL image
-                    
-                    # If dark enough, laser ON. Scale 0-255 (image) to 0-1000 (GRBL). Darker = higher power.
-                    if pixel_intensity < self.laser_threshold:
-                        # Invert intensity for laser power: 0 intensity (black) = max power, 255 (white) = min power
-                        laser_power = int(1000 * (1 - pixel_intensity / 255.0))
-                        laser_power = max(1, min(1000, laser_power)) # Ensure it's between 1 and 1000
-                        gcode_commands.append(f"M3 S{laser_power} G1 X{grbl_x_mm:.3f} Y{grbl_y_mm:.3f}")
-                    else: # If too bright, laser OFF (move without burning)
-                        gcode_commands.append(f"M5 S0 G0 X{grbl_x_mm:.3f} Y{grbl_y_mm:.3f}")
-            else:  # Odd row (1, 3, 5...): Right to Left
-                for x_px in range(img_width_px - 1, -1, -1): # Iterate backwards
-                    grbl_x_mm = x_px / self.preview_image_resolution_ppm
-                    
-                    pixel_intensity = img.getpixel((x_px, y_px))
-                    
-                    if pixel_intensity < self.laser_threshold:
-                        laser_power = int(1000 * (1 - pixel_intensity / 255.0))
-                        laser_power = max(1, min(1000, laser_power))
-                        gcode_commands.append(f"M3 S{laser_power} G1 X{grbl_x_mm:.3f} Y{grbl_y_mm:.3f}")
-                    else:
-                        gcode_commands.append(f"M5 S0 G0 X{grbl_x_mm:.3f} Y{grbl_y_mm:.3f}")
-            
-            # After each row, ensure the laser is off before moving to the next row (if not already off)
-            gcode_commands.append("M5 S0") 
+        img_width_px = int(target_width_mm * ppm)
+        img_height_px = int(target_height_mm * ppm)
+
+        # Decoding and conversion run on the thread pool so the GUI and serial I/O stay responsive
+        self._convert_worker = ConvertWorker(self.image_path, img_width_px, img_height_px, ppm, threshold,
+                                             self.feed_rate_slider.value(), self.scaling_combo.currentData())
+        self._convert_worker.signals.finished.connect(self._on_conversion_finished)
+        self._convert_worker.signals.error.connect(self._on_conversion_error)
+        self.convert_to_gcode_button.setEnabled(False)
+        QThreadPool.globalInstance().start(self._convert_worker)
 
-        gcode_commands.append("G0 X0 Y0") # Return to origin
-        gcode_commands.append("M5 S0") # Ensure laser is off
-        
-        gcode_str = "\n".join(gcode_commands)
-        self.gcode_input.setText(gcode_str)
+    def _on_conversion_finished(self, gcode_commands, toolpath, line_times):
+        """Receives the G-code generated by ConvertWorker."""
+        self._convert_worker = None
+        self.convert_to_gcode_button.setEnabled(self.serial_port.isOpen())
+        self._set_generated_gcode(gcode_commands, toolpath, line_times)
         QMessageBox.information(self, "Conversion Complete", "Image successfully converted to G-code.")
         
         # Update preview with the newly generated G-code
-        self.preview_gcode(gcode_commands)
+        self.preview_gcode(gcode_commands, toolpath)
+
+    def _on_conversion_error(self, title, message):
+        """Reports a failed ConvertWorker run."""
+        self._convert_worker = None
+        self.convert_to_gcode_button.setEnabled(self.serial_port.isOpen())
+        QMessageBox.critical(self, title, message)
+
+    def _set_generated_gcode(self, gcode_commands, toolpath, line_times):
+        """Loads generated G-code into the editor in one shot and keeps the lines for streaming."""
+        if len(gcode_commands) > GCODE_EDITOR_MAX_LINES:
+            # Only the head of a large program is shown; it is streamed from memory. The editor is
+            # read-only meanwhile, as editing the partial text would drop the rest of the program.
+            gcode_text = "\n".join(gcode_commands[:GCODE_EDITOR_MAX_LINES])
+            gcode_text += f"\n; ... {len(gcode_commands) - GCODE_EDITOR_MAX_LINES} more lines not shown"
+            self.gcode_input.setReadOnly(True)
+        else:
+            gcode_text = "\n".join(gcode_commands)
+            self.gcode_input.setReadOnly(False)
+        # A single setPlainText with undo tracking off avoids a relayout and undo entry per line
+        self.gcode_input.blockSignals(True)
+        self.gcode_input.document().setUndoRedoEnabled(False)
+        self.gcode_input.setPlainText(gcode_text)
+        self.gcode_input.document().setUndoRedoEnabled(True)
+        self.gcode_input.blockSignals(False)
+        self._gcode_lines = gcode_commands
+        self._gcode_toolpath = toolpath
+        self._gcode_estimate = line_times
+
+    def clear_gcode(self):
+        """Empties the G-code editor and makes it editable again."""
+        self.gcode_input.setReadOnly(False)
+        self.gcode_input.clear() # textChanged drops the cached generated lines
+
+    def _on_gcode_text_edited(self):
+        """Drops the cached generated lines once the user edits the G-code by hand."""
+        self._gcode_lines = None
+        self._gcode_toolpath = None
+        self._gcode_estimate = None
+
+    def preview_gcode_input(self):
+        """Draws the preview of the G-code currently in the editor, e.g. pasted by hand."""
+        if self._gcode_toolpath is not None:
+            self.preview_gcode(self._gcode_lines, self._gcode_toolpath)
+        else:
+            self.preview_gcode(self.gcode_input.toPlainText())
+
+    def preview_gcode(self, gcode_commands_list, toolpath=None):
+        """
+        Draws the G-code path on the QGraphicsScene. A toolpath from raster_to_gcode can be
+        passed in to skip parsing the G-code text again.
+        """
+        # Nothing is built for a hidden view; the latest request is drawn once it is shown
+        self._preview_generation += 1 # Also drops the result of a preview still being built
+        if not self.graphics_view.isVisible():
+            self._deferred_preview = (gcode_commands_list, toolpath)
+            return
+        self._deferred_preview = None
 
-    def preview_gcode(self, gcode_commands_list):
-        """Draws the G-code path on the QGraphicsScene."""
+        if self._pos_indicator.scene() is not None:
+            self.graphics_scene.removeItem(self._pos_indicator) # Reused, not deleted by clear()
         self.graphics_scene.clear() # Clear previous drawings
 
         # Draw grid
-        scene_width = float(self.width_input.text()) if self.width_input.text() else 50
-        scene_height = float(self.height_input.text()) if self.height_input.text() else 50
+        # Parsed like the conversion settings; 50 mm while a field is not acceptable
+        scene_width = self._input_value(self.width_input, QLocale.toDouble)
+        scene_height = self._input_value(self.height_input, QLocale.toDouble)
+        if scene_width is None:
+            scene_width = 50.0
+        if scene_height is None:
+            scene_height = 50.0
         
         # Set scene rect based on the image dimensions
         self.graphics_scene.setSceneRect(0, 0, scene_width, scene_height)
 
-        grid_pen = QPen(QColor(60, 60, 60), 0.5) # Darker gray for grid
-        
-        # Draw horizontal lines
-        for y in range(int(scene_height) + 1):
-            self.graphics_scene.addLine(0, y, scene_width, y, grid_pen)
-        # Draw vertical lines
-        for x in range(int(scene_width) + 1):
-            self.graphics_scene.addLine(x, 0, x, scene_height, grid_pen)
+        # The 1 mm grid is a single path item rather than one line item per grid line
+        grid_path = QPainterPath()
+        for y in range(int(scene_height) + 1): # Horizontal lines
+            grid_path.moveTo(0, y)
+            grid_path.lineTo(scene_width, y)
+        for x in range(int(scene_width) + 1): # Vertical lines
+            grid_path.moveTo(x, 0)
+            grid_path.lineTo(x, scene_height)
+        self.graphics_scene.addPath(grid_path, self._grid_pen)
 
         # Draw origin (0,0) crosshairs
-        origin_pen = QPen(QColor(255, 0, 0), 1.5) # Red for origin
-        self.graphics_scene.addLine(-2, 0, 2, 0, origin_pen) # X
-        self.graphics_scene.addLine(0, -2, 0, 2, origin_pen) # Y
+        self.graphics_scene.addLine(-2, 0, 2, 0, self._origin_pen) # X
+        self.graphics_scene.addLine(0, -2, 0, 2, self._origin_pen) # Y
 
         # Draw bounds rectangle
-        bounds_pen = QPen(QColor(100, 100, 255), 2) # Blue for bounds
-        self.graphics_scene.addRect(0, 0, scene_width, scene_height, bounds_pen)
+        self.graphics_scene.addRect(0, 0, scene_width, scene_height, self._bounds_pen)
 
         # G-code Path Visualization
-        # We will store the path to draw segment by segment during execution,
-        # but for initial preview, we draw the full path.
-        self.gcode_path_items = [] # Store individual line items for dynamic update
-        
-        current_preview_x = 0.0
-        current_preview_y = 0.0
-        
-        for command in gcode_commands_list:
-            command = command.strip().upper()
-            
-            # Ignore comments, empty lines
-            if not command or command.startswith('(') or command.startswith(';'):
-                continue
-            
-            # Extract G0/G1 movements
-            # Using regex to find X and Y coordinates in G0/G1 commands
-            match_g0_g1 = re.search(r'(G0|G1)\s*(?:X([-\d.]+))?\s*(?:Y([-\d.]+))?', command)
-            if match_g0_g1:
-                cmd_type = match_g0_g1.group(1)
-                new_x_str = match_g0_g1.group(2)
-                new_y_str = match_g0_g1.group(3)
-                
-                # Update coordinates only if present in the command
-                new_x = float(new_x_str) if new_x_str is not None else current_preview_x
-                new_y = float(new_y_str) if new_y_str is not None else current_preview_y
-                
-                # Check for laser power (M3 SXXX) for color coding
-                is_laser_on = "M3" in command and "S" in command # Simple check
-                
-                # Add line segment to the path for preview
-                path_pen = QPen(QColor(0, 200, 0) if is_laser_on else QColor(200, 200, 200), 0.5) # Green for laser on, grey for rapid/off
-                line = self.graphics_scene.addLine(current_preview_x, current_preview_y, new_x, new_y, path_pen)
-                self.gcode_path_items.append(line)
-
-                current_preview_x = new_x
-                current_preview_y = new_y
-            
-        # Add the current position indicator after drawing the full path
+        # Parsing and path building run on the thread pool, so large programs don't freeze the GUI
+        worker = PreviewWorker(self._preview_generation, gcode_commands_list, toolpath)
+        worker.signals.finished.connect(self._on_preview_paths_ready)
+        QThreadPool.globalInstance().start(worker)
+
+        # Add the current position indicator; it stays above the path items added later
+        # Scale indicator size based on scene dimensions for better visibility
+        if scene_width > 0 and scene_height > 0:
+            pos_indicator_size = max(1.0, min(scene_width, scene_height) / 50) # Make it ~1/50th of smallest dimension
+        else:
+            pos_indicator_size = 1.0 # Default if scene not yet defined
+        self._pos_indicator.setScale(pos_indicator_size)
+        self.graphics_scene.addItem(self._pos_indicator)
         self._update_preview_current_position()
 
         # Center and fit the view
         self.graphics_view.fitInView(self.graphics_scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
         self.graphics_view.centerOn(self.graphics_scene.sceneRect().center())
 
+    def _on_preview_paths_ready(self, generation, burn_path, travel_path):
+        """Adds the paths built by PreviewWorker to the scene, each as a single item."""
+        if generation != self._preview_generation:
+            return # Superseded by a newer preview, whose scene has already been cleared
+        # Grey for rapid/off moves, drawn below green for laser on
+        self.graphics_scene.addPath(travel_path, self._travel_pen)
+        self.graphics_scene.addPath(burn_path, self._burn_pen)
 
     def _update_preview_current_position(self):
-        """Updates the yellow dot representing the GRBL's current work position on the graphics scene."""
-        # Remove old "current position" indicator if exists
-        for item in self.graphics_scene.items():
-            if hasattr(item, '_is_current_pos_indicator') and item._is_current_pos_indicator:
-                self.graphics_scene.removeItem(item)
-        
-        # Add new current position indicator
-        # Scale indicator size based on scene dimensions for better visibility
-        scene_width = self.graphics_scene.sceneRect().width()
-        scene_height = self.graphics_scene.sceneRect().height()
-        
-        if scene_width > 0 and scene_height > 0:
-            pos_indicator_size = max(1.0, min(scene_width, scene_height) / 50) # Make it ~1/50th of smallest dimension
-        else:
-            pos_indicator_size = 1.0 # Default if scene not yet defined
-            
-        current_pos_rect = QGraphicsRectItem(self.current_x - pos_indicator_size/2, self.current_y - pos_indicator_size/2, pos_indicator_size, pos_indicator_size)
-        current_pos_rect.setBrush(QColor(255, 255, 0)) # Yellow dot
-        current_pos_rect.setPen(QPen(Qt.PenStyle.NoPen))
-        current_pos_rect._is_current_pos_indicator = True # Custom attribute to identify it
-        self.graphics_scene.addItem(current_pos_rect)
+        """Moves the yellow dot representing the GRBL's current work position on the graphics scene."""
+        self._pos_indicator.setPos(self.current_x, self.current_y)
 
 
+    def graphics_view_showEvent(self, event):
+        """Draws the preview requested while the graphics view was hidden, if any."""
+        QGraphicsView.showEvent(self.graphics_view, event)
+        if self._deferred_preview is not None:
+            self.preview_gcode(*self._deferred_preview)
+
     def graphics_view_wheelEvent(self, event):
         """Handles zooming with the mouse wheel for the graphics view."""
         zoom_factor = 1.15
@@ -1138,52 +1866,83 @@ class LaserControllerApp(QWidget):
             self.graphics_view.scale(1 / zoom_factor, 1 / zoom_factor)
 
     def send_gcode(self):
-        """Starts sending G-code commands from the QTextEdit."""
-        gcode_text = self.gcode_input.toPlainText()
-        self.gcode_to_send_queue = [
-            line.strip() for line in gcode_text.split('\n') 
-            if line.strip() and not line.strip().startswith(';') and not line.strip().startswith('(') # Filter out comments and empty lines
-        ]
+        """Starts sending G-code commands from the editor."""
+        if self._gcode_lines is not None:
+            # Generated G-code is streamed straight from its list, without copying it
+            gcode_lines = self._gcode_lines
+        else:
+            gcode_text = self.gcode_input.toPlainText()
+            stripped_lines = (line.strip() for line in gcode_text.splitlines()) # Stripped once per line
+            gcode_lines = [
+                line for line in stripped_lines
+                if line and not line.startswith((';', '(')) # Filter out comments and empty lines
+            ]
         
-        if not self.gcode_to_send_queue:
+        if not gcode_lines:
             QMessageBox.warning(self, "G-code", "No G-code found to send.")
             return
 
         if not self.serial_port.isOpen():
             QMessageBox.warning(self, "Error", "Not connected to Arduino. Please connect first.")
             return
+
+        if self._gcode_job_active:
+            QMessageBox.warning(self, "G-code Running", "Please wait for the G-code transmission to finish.")
+            return
         
         confirm = QMessageBox.question(self, "Start G-code Transmission",
-                                       f"Are you sure you want to start transmitting {len(self.gcode_to_send_queue)} lines of G-code?",
+                                       f"Are you sure you want to start transmitting {len(gcode_lines)} lines of G-code?",
                                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if confirm == QMessageBox.StandardButton.Yes:
-            self.total_gcode_lines = len(self.gcode_to_send_queue)
+            self.total_gcode_lines = len(gcode_lines)
             self.gcode_lines_sent = 0
             self.gcode_current_line_index = -1 # Reset to -1, will become 0 on first send
             self.progress_bar.setValue(0)
             self.estimated_time_label.setText("Estimated Time: Calculating...")
             self.gcode_start_time = time.time() # Record start time
+            # Progress follows the estimated machine time rather than the line count, as a short
+            # rapid and a long cut take very different times; no moves leaves it line-based
+            self._gcode_job_generation += 1
+            self._gcode_line_times = None
+            if self._gcode_estimate is not None:
+                self._set_gcode_line_times(self._gcode_job_generation, self._gcode_estimate)
+            else:
+                # Hand-edited text is estimated on the thread pool; progress counts lines until then
+                worker = EstimateWorker(self._gcode_job_generation, gcode_lines)
+                worker.signals.finished.connect(self._set_gcode_line_times)
+                QThreadPool.globalInstance().start(worker)
 
+            self._queue_gcode(gcode_lines)
+            self._log(f"[INFO] Streaming {self.total_gcode_lines} lines of G-code", "info")
             self._send_next_gcode_command() # Start the sending process
+            self.update_ui_state(True) # Manual commands are disabled while the job runs
             QMessageBox.information(self, "Started", "G-code transmission has begun.")
-        else:
-            self.gcode_to_send_queue = [] # Clear queue if user cancels
+
+    def _set_gcode_line_times(self, generation, line_times):
+        """Makes the progress of the running job follow its estimated line times."""
+        if generation != self._gcode_job_generation or not self._gcode_job_active or line_times[-1] <= 0:
+            return # Estimated for an earlier or ended job, or no moves to time
+        self._gcode_line_times = line_times
+        self._progress_dirty = True
+        self._schedule_ui_refresh()
 
     def update_gcode_progress(self):
         """Updates the progress bar and estimated time."""
         if self.total_gcode_lines > 0:
-            progress_percent = int((self.gcode_lines_sent / self.total_gcode_lines) * 100)
+            if self._gcode_line_times is None:
+                done_fraction = self.gcode_lines_sent / self.total_gcode_lines
+            elif self.gcode_lines_sent > 0:
+                done_fraction = self._gcode_line_times[self.gcode_lines_sent - 1] / self._gcode_line_times[-1]
+            else:
+                done_fraction = 0.0
+            progress_percent = int(done_fraction * 100)
             self.progress_bar.setValue(progress_percent)
 
-            if self.gcode_lines_sent > 0:
+            if done_fraction > 0:
                 elapsed_time = time.time() - self.gcode_start_time
                 if elapsed_time > 0:
-                    # Estimate remaining time
-                    time_per_line = elapsed_time / self.gcode_lines_sent
-                    remaining_lines = self.total_gcode_lines - self.gcode_lines_sent
-                    estimated_remaining_time = remaining_lines * time_per_line
-                    
-                    total_estimated_time = elapsed_time + estimated_remaining_time
+                    # The rest of the job is assumed to go at the pace measured so far
+                    total_estimated_time = elapsed_time / done_fraction
                     self.estimated_time_label.setText(f"Estimated Time: {self._format_time(total_estimated_time)}")
             else:
                 self.estimated_time_label.setText("Estimated Time: Calculating...")
@@ -1193,36 +1952,35 @@ class LaserControllerApp(QWidget):
 
     def _format_time(self, seconds):
         """Formats seconds into HH:MM:SS string."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        return f"{hours:02}:{minutes:02}:{secs:02}"
+        return _format_hms(int(seconds))
 
     def _highlight_gcode_line(self, line_index):
-        """Highlights the specified line in the gcode_input QTextEdit."""
-        # Clear previous highlighting
-        format = QTextCharFormat()
-        format.setBackground(QColor(0, 0, 0, 0)) # Transparent background
-        cursor = QTextCursor(self.gcode_input.document())
-        cursor.select(QTextCursor.SelectionType.Document)
-        cursor.setCharFormat(format)
-
-        if line_index >= 0 and line_index < self.gcode_input.document().blockCount():
-            # Apply new highlighting
-            highlight_format = QTextCharFormat()
-            highlight_format.setBackground(QColor(50, 150, 255, 100)) # Light blue with transparency
-
-            cursor.setPosition(0)
-            cursor.movePosition(QTextCursor.MoveOperation.Down, QTextCursor.MoveMode.MoveAnchor, line_index)
-            cursor.select(QTextCursor.SelectionType.LineUnderCursor)
-            cursor.setCharFormat(highlight_format)
+        """Schedules highlighting of the specified line in the gcode_input editor (-1 clears it)."""
+        self._highlight_line_index = line_index
+        self._highlight_dirty = True
+        self._schedule_ui_refresh()
+
+    def _apply_gcode_line_highlight(self):
+        """Moves the highlight extra selection to the most recently requested line."""
+        line_index = self._highlight_line_index
+        document = self.gcode_input.document()
+        if 0 <= line_index < document.blockCount():
+            cursor = QTextCursor(document.findBlockByNumber(line_index))
+            self._highlight_sel.cursor = cursor
+            self.gcode_input.setExtraSelections([self._highlight_sel])
             
-            # Scroll to make the highlighted line visible
-            self.gcode_input.ensureCursorVisible()
+            # Scroll to make the highlighted line visible, leaving the user's caret and selection alone.
+            # QPlainTextEdit scrolls by blocks, so the scroll bar value is the first visible line.
+            scroll_bar = self.gcode_input.verticalScrollBar()
+            if not scroll_bar.value() <= line_index < scroll_bar.value() + scroll_bar.pageStep():
+                scroll_bar.setValue(line_index - scroll_bar.pageStep() // 2) # Centred
+        else:
+            self.gcode_input.setExtraSelections([]) # Clear highlighting
 
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    app.setStyleSheet(_APP_QSS)
     ex = LaserControllerApp()
     ex.show()
     sys.exit(app.exec())
\ No newline at end of file
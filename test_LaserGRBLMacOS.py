@@ -0,0 +1,211 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PyQt6.QtWidgets")
+
+import LaserGRBLMacOS as app  # noqa: E402
+
+
+def toolpath_lists(gcode):
+    return [column.tolist() for column in app.parse_gcode_toolpath(gcode)]
+
+
+def test_words_in_comments_are_ignored():
+    assert toolpath_lists("G0 X0 Y0\nG1 X10 (go to X50 Y50) F500") == [[0.0, 10.0], [0.0, 0.0], [0.0, 0.0]]
+    assert toolpath_lists("G1 X10 Y10 ; was X99") == [[10.0], [10.0], [0.0]]
+    assert toolpath_lists("(setup) G0 X5 (unclosed X9") == [[5.0], [0.0], [0.0]]
+    assert toolpath_lists("$H\n; X7 Y7\n(X8)\nG0 X3 Y4") == [[3.0], [4.0], [0.0]]
+
+
+def test_feed_rate_in_comment_does_not_change_the_estimate():
+    assert app.estimate_gcode_times(["G1 X10 F600 (was F60)"]).tolist() == [1.0]
+    assert app.estimate_gcode_times(["G1 X10 F600 ; F6000"]).tolist() == [1.0]
+
+
+def burned_pixels(gcode_commands, shape, ppm):
+    """Laser power left on every pixel by the G1 moves of raster G-code, pixel i covering [i, i + 1) / ppm."""
+    x, y, s = app.parse_gcode_toolpath(gcode_commands)
+    edge_x = np.rint(np.append(0, x) * ppm).astype(int)
+    row = np.rint(np.append(0, y) * ppm).astype(int)
+    burned = np.zeros(shape)
+    passes = np.zeros(shape, dtype=int)
+    for k in np.flatnonzero(s > 0):
+        assert row[k] == row[k + 1]
+        start, end = sorted((edge_x[k], edge_x[k + 1]))
+        burned[row[k], start:end] = s[k]
+        passes[row[k], start:end] += 1
+    assert passes.max(initial=0) <= 1
+    return burned
+
+
+def test_raster_burns_every_dark_pixel_inside_the_image():
+    assert app.raster_to_gcode(np.zeros((2, 4), dtype=np.uint8), 5, 200, 1000)[0] == [
+        "G21", "G90", "G17", "F1000", "M5 S0", "G0X0Y0", "M3G1X0.8S1000", "M5G0Y0.2", "M3G1X0", "M5G0Y0", "M5 S0"]
+
+    rng = np.random.default_rng(0)
+    for i in range(300):
+        height, width = rng.integers(1, 25, 2)
+        ppm = int(rng.integers(1, 50))
+        pixels = rng.integers(0, 256, (height, width)).astype(np.uint8)
+        if i % 3 == 0:
+            pixels[:, :rng.integers(0, width + 1)] = 0  # Dark left edge
+        if i % 4 == 0:
+            pixels[:, rng.integers(0, width):] = 0  # Dark right edge
+        gcode_commands, toolpath, line_times = app.raster_to_gcode(pixels, ppm, 200, 1000)
+
+        x, y, _ = app.parse_gcode_toolpath(gcode_commands)
+        assert x.min() >= 0 and x.max() <= width / ppm + 1e-3
+        assert y.min() >= 0 and y.max() <= (height - 1) / ppm + 1e-3
+        expected = app._POWER_LUT[pixels].astype(float)
+        expected[pixels >= 200] = 0
+        assert np.array_equal(burned_pixels(gcode_commands, pixels.shape, ppm), expected)
+        for column, parsed in zip(toolpath, app.parse_gcode_toolpath(gcode_commands)):
+            assert np.allclose(column, parsed, atol=1e-3)
+        assert np.allclose(line_times, app.estimate_gcode_times(gcode_commands))
+
+
+def path_elements(path):
+    return [(path.elementAt(i).type, path.elementAt(i).x, path.elementAt(i).y) for i in range(path.elementCount())]
+
+
+def test_segments_to_path_matches_moveto_lineto_construction():
+    from PyQt6.QtGui import QPainterPath
+
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        count = int(rng.integers(0, 30))
+        # A small grid gives continued, repeated and zero-length segments
+        end_x, end_y = rng.integers(0, 4, (2, count)).astype(np.float64)
+        start_x, start_y = rng.integers(0, 4, (2, count)).astype(np.float64)
+        continued = rng.random(count) < 0.5
+        continued[0:1] = False
+        start_x[continued] = np.roll(end_x, 1)[continued]
+        start_y[continued] = np.roll(end_y, 1)[continued]
+
+        expected = QPainterPath()
+        path_end = None
+        for sx, sy, ex, ey in zip(start_x.tolist(), start_y.tolist(), end_x.tolist(), end_y.tolist()):
+            if path_end != (sx, sy):
+                expected.moveTo(sx, sy)
+            expected.lineTo(ex, ey)
+            path_end = (ex, ey)
+
+        path = app._segments_to_path(start_x, start_y, end_x, end_y)
+        assert path_elements(path) == path_elements(expected)
+        assert path.fillRule() == expected.fillRule()
+        assert path == expected
+        # The serialized start of the last sub-path is what closeSubpath returns to
+        path.closeSubpath()
+        expected.closeSubpath()
+        assert path_elements(path) == path_elements(expected)
+
+
+def reference_raster_to_gcode(pixels, ppm, threshold, feed_rate):
+    """Pixel by pixel version of raster_to_gcode: zig-zag rows, one move per run of equal power."""
+    height, width = pixels.shape
+    moves = []  # (x edge, row, power)
+    for y in range(height):
+        powers = [0 if value >= threshold else int(app._POWER_LUT[value]) for value in pixels[y].tolist()]
+        if y % 2 == 1:
+            powers.reverse()
+        dark = [i for i, power in enumerate(powers) if power]
+        if not dark:
+            continue
+        row_moves = [(dark[0], 0)]
+        for i in range(dark[0], dark[-1] + 1):
+            if i == dark[-1] or powers[i + 1] != powers[i]:
+                row_moves.append((i + 1, powers[i]))
+        moves += [(width - edge if y % 2 == 1 else edge, y, power) for edge, power in row_moves]
+    moves.append((0, 0, 0))
+
+    lines = ["G21", "G90", "G17", f"F{feed_rate}", "M5 S0"]
+    laser_on, motion, last_x, last_y, last_power = False, None, None, None, 0
+    for x_px, y_px, power in moves:
+        x, y = app._format_mm(x_px / ppm), app._format_mm(y_px / ppm)
+        if (x, y) == (last_x, last_y):
+            continue
+        words = []
+        if power and not laser_on:
+            words.append('M3')
+        elif not power and laser_on:
+            words.append('M5')
+        laser_on = bool(power)
+        if motion != ('G1' if power else 'G0'):
+            motion = 'G1' if power else 'G0'
+            words.append(motion)
+        if x != last_x:
+            words.append('X' + x)
+        if y != last_y:
+            words.append('Y' + y)
+        if power and power != last_power:
+            words.append(f'S{power}')
+            last_power = power
+        last_x, last_y = x, y
+        lines.append(''.join(words))
+    lines.append("M5 S0")
+    moves = np.array(moves, dtype=np.float32).reshape(-1, 3)
+    return lines, (moves[:, 0] / ppm, moves[:, 1] / ppm, moves[:, 2])
+
+
+def test_raster_to_gcode_matches_pixel_by_pixel_conversion():
+    rng = np.random.default_rng(1)
+    for i in range(300):
+        height, width = rng.integers(1, 25, 2)
+        ppm = int(rng.integers(1, 50))
+        # Few grey levels give long runs; the threshold also varies
+        pixels = rng.choice(np.array([0, 60, 128, 199, 200, 255], dtype=np.uint8), (height, width))
+        if i % 5 == 0:
+            pixels[rng.integers(0, height)] = 255  # Blank row
+        threshold = int(rng.integers(1, 256))
+        gcode_commands, toolpath, _ = app.raster_to_gcode(pixels, ppm, threshold, 1200)
+        expected_commands, expected_toolpath = reference_raster_to_gcode(pixels, ppm, threshold, 1200)
+        assert gcode_commands == expected_commands
+        for column, expected in zip(toolpath, expected_toolpath):
+            assert column.dtype == np.float32 and np.array_equal(column, expected)
+
+
+def reference_line_states(gcode_lines):
+    """Line by line version of _gcode_line_states."""
+    import re
+
+    motion_mode, laser_enabled, laser_power, feed_rate, x, y = -1.0, False, 0.0, 0.0, 0.0, 0.0
+    states = []
+    for line in gcode_lines:
+        line = line.upper()
+        words = []
+        if not re.match(r'\s*\$', line):
+            line = re.sub(r'\([^)]*\)?|;.*', '', line)
+            words = [(letter, float(value)) for letter, value in
+                     re.findall(r'([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))', line, re.ASCII)]
+        g_codes = [value for letter, value in words if letter == 'G']
+        for letter, value in words:
+            if letter == 'G' and (value in (0, 1, 2, 3) or 38 <= value < 39):
+                motion_mode = value
+            elif letter == 'G' and value == 80:
+                motion_mode = -1.0
+            elif letter == 'M' and value in (3, 4, 5):
+                laser_enabled = value != 5
+            elif letter == 'S':
+                laser_power = value
+            elif letter == 'F':
+                feed_rate = value
+        x_words = [value for letter, value in words if letter == 'X']
+        y_words = [value for letter, value in words if letter == 'Y']
+        moving = motion_mode >= 0 and not any(g in (10, 28, 30, 92) for g in g_codes)
+        if moving or 92 in g_codes:
+            x = x_words[-1] if x_words else x
+            y = y_words[-1] if y_words else y
+        states.append((moving and bool(x_words or y_words), x, y, motion_mode, laser_enabled, laser_power, feed_rate))
+    return states
+
+
+def test_gcode_line_states_match_line_by_line_parsing():
+    vocabulary = ["G0", "G1", "G01", "G2", "G3", "G38.2", "G80", "G92", "G10 L20 P1", "G28", "G30", "G21",
+                  "M3", "M4", "M5", "S0", "S500", "F0", "F800", "X5", "Y-2.5", "X.5", "x12", "Y 3", "I1 J1",
+                  "(note X99 F1)", "; X42", "(open X7", "G", "Q", "$H", "  $X"]
+    rng = np.random.default_rng(2)
+    for _ in range(1000):
+        gcode_lines = [" ".join(rng.choice(vocabulary, rng.integers(0, 5))) for _ in range(rng.integers(1, 15))]
+        states = app._gcode_line_states(gcode_lines)
+        expected = reference_line_states(gcode_lines)
+        assert [tuple(column[i].item() for column in states) for i in range(len(gcode_lines))] == expected, gcode_lines